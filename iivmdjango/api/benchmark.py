@@ -0,0 +1,246 @@
+"""
+Synthetic data and measurements behind `manage.py benchmark_api`.
+
+`generate_dataset(size)` fills the database with a reproducible dictionary
+of `size` terms (translations in several languages, some colloquial
+variants) plus a backlog of liked suggestions, written through the
+importer and bulk_create. Each `Scenario` drives one endpoint through the
+Django test client; `measure` records latency percentiles, query counts,
+response size and the peak memory traced while serving a request.
+"""
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import vocabulary_cache
+from .importer import import_vocabulary
+from .models import VocabularyItem, NewWordSuggestion, SuggestionToVocabularyItem, Translation
+from .normalization import fold
+from .request_metrics import percentile
+from .signals import IN_MEMORY_INDEXES
+from .similarity import suggestion_similarity_index
+
+LANGUAGES = ['pl', 'de', 'uk', 'es']
+CATEGORIES = ['symptoms', 'diseases', 'anatomy', 'procedures', 'medications']
+SYLLABLES = [
+    'ab', 'al', 'an', 'ar', 'bi', 'bro', 'car', 'ce', 'chol', 'cyst', 'der', 'di', 'en', 'fi', 'gas', 'gli',
+    'he', 'hy', 'ic', 'in', 'is', 'ka', 'lar', 'li', 'lo', 'ma', 'me', 'mi', 'my', 'ne', 'no', 'o', 'os',
+    'pa', 'per', 'pho', 'pul', 'ra', 're', 'ri', 'sar', 'sis', 'ta', 'te', 'ther', 'thy', 'to', 'tra',
+    'tri', 'u', 'va', 'ven', 'xi', 'zo',
+]
+PERCENTILES = [50, 90, 95, 99]
+USERS = 20
+
+
+class BenchmarkFailed(Exception):
+    pass
+
+
+def synthetic_word(rng, syllables=(2, 4)):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(*syllables)))
+
+
+def synthetic_phrase(rng, words=(1, 2)):
+    return ' '.join(synthetic_word(rng) for _ in range(rng.randint(*words)))
+
+
+def synthetic_records(size, seed=0):
+    """Yield `size` importer records with distinct terms; the same seed gives the same records."""
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < size:
+        term = synthetic_phrase(rng)
+        if term in terms:
+            continue
+        terms.add(term)
+        translations = []
+        for language in rng.sample(LANGUAGES, rng.randint(1, len(LANGUAGES))):
+            translations.append({'language': language, 'translation': synthetic_phrase(rng), 'is_primary': True})
+            if rng.random() < 0.3:
+                translations.append({'language': language, 'translation': synthetic_phrase(rng), 'is_colloquial': True})
+        yield {
+            'term': term.capitalize(),
+            'definition': ' '.join(synthetic_word(rng) for _ in range(rng.randint(10, 40))),
+            'category': rng.choice(CATEGORIES),
+            'translations': translations,
+        }
+
+
+def _add_likes(model, users, rng):
+    through = model.likes.through
+    field = f'{model._meta.model_name}_id'
+    likes = []
+    for pk in model.objects.values_list('pk', flat=True):
+        for user in rng.sample(users, rng.randint(0, 5)):
+            likes.append(through(**{field: pk, 'user_id': user.pk}))
+    through.objects.bulk_create(likes, batch_size=1000)
+    model.objects.recount_likes()
+
+
+def generate_dataset(size, seed=0):
+    """
+    Replace the dictionary with `size` synthetic terms and add a backlog of
+    size/10 vocabulary suggestions and size/20 new-word suggestions, liked
+    by up to five of USERS benchmark users each. Returns the users.
+    """
+    import_vocabulary(synthetic_records(size, seed), mode='replace')
+    rng = random.Random(seed + 1)
+
+    with transaction.atomic():
+        User.objects.bulk_create(
+            [User(username=f'benchmark-{i}', password='!') for i in range(USERS)], ignore_conflicts=True
+        )
+        users = list(User.objects.filter(username__startswith='benchmark-').order_by('pk'))
+        item_ids = list(VocabularyItem.objects.values_list('pk', flat=True))
+
+        suggestions = []
+        for _ in range(max(1, size // 10)):
+            text = synthetic_phrase(rng)
+            suggestions.append(SuggestionToVocabularyItem(
+                vocabulary_item_id=rng.choice(item_ids), suggestion_type=rng.choice(['translation', 'colloquial']),
+                suggestion=text, normalized_suggestion=fold(text), language=rng.choice(LANGUAGES),
+            ))
+        SuggestionToVocabularyItem.objects.bulk_create(suggestions, batch_size=1000, ignore_conflicts=True)
+
+        new_words = []
+        for _ in range(max(1, size // 20)):
+            term = synthetic_phrase(rng, words=(2, 3))
+            new_words.append(NewWordSuggestion(
+                term=term, normalized_term=fold(term), definition=synthetic_phrase(rng, words=(5, 10)),
+                translation=synthetic_phrase(rng), language=rng.choice(LANGUAGES), category=rng.choice(CATEGORIES),
+            ))
+        NewWordSuggestion.objects.bulk_create(new_words, batch_size=1000, ignore_conflicts=True)
+
+        _add_likes(SuggestionToVocabularyItem, users, rng)
+        _add_likes(NewWordSuggestion, users, rng)
+
+    # Start every size from cold caches and indexes.
+    vocabulary_cache.clear()
+    for index in IN_MEMORY_INDEXES + [suggestion_similarity_index]:
+        index.invalidate()
+    return users
+
+
+class Scenario:
+    """One endpoint; request i goes to paths[i % len(paths)]."""
+
+    def __init__(self, name, paths, method='get', authenticated=False):
+        self.name = name
+        self.paths = paths
+        self.method = method
+        self.authenticated = authenticated
+
+    def prepare(self):
+        """Hook run once before the first request."""
+
+    def request(self, client, i, headers):
+        path = self.paths[i % len(self.paths)]
+        response = getattr(client, self.method)(path, **(headers if self.authenticated else {}))
+        if response.status_code >= 400:
+            raise BenchmarkFailed(f'{self.name}: {path} returned {response.status_code}')
+        # Streaming bodies are produced while being read, so read them here.
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return len(body)
+
+
+class VocabularyWriteScenario(Scenario):
+    """
+    Re-save one item and its translations per request in one transaction,
+    as an admin edit does. The in-memory indexes are built beforehand, so
+    the timings include the search index update and the index refreshes
+    run on commit; `paths` holds item ids.
+    """
+
+    def prepare(self):
+        for index in IN_MEMORY_INDEXES:
+            index.current_state()
+
+    def request(self, client, i, headers):
+        with transaction.atomic():
+            item = VocabularyItem.objects.get(pk=self.paths[i % len(self.paths)])
+            item.save()
+            for translation in Translation.objects.filter(vocabulary_item=item):
+                translation.save()
+        return 0
+
+
+def build_scenarios(seed=0):
+    rng = random.Random(seed + 2)
+    # Seeded samples keep the requested paths identical between runs.
+    items = list(VocabularyItem.objects.order_by('pk').values_list('pk', 'term'))
+    items = rng.sample(items, min(50, len(items)))
+    words = [term.split()[0] for _, term in items]
+    busiest = (
+        SuggestionToVocabularyItem.objects.values_list('vocabulary_item_id', flat=True)
+        .order_by('-like_count').first()
+    )
+    like_ids = list(SuggestionToVocabularyItem.objects.order_by('pk').values_list('pk', flat=True)[:50])
+    return [
+        Scenario('vocabulary-items', [reverse('vocabulary-items')]),
+        Scenario('vocabulary-items page', [reverse('vocabulary-items') + '?limit=50']),
+        Scenario('vocabulary-item detail', [reverse('vocabulary-items-detail', args=[pk]) for pk, _ in items]),
+        Scenario('search', [f"{reverse('search-vocabulary')}?q={word}" for word in words]),
+        Scenario('fuzzy search', [f"{reverse('search-vocabulary')}?fuzzy=1&q={word[:-1] + 'x'}" for word in words]),
+        Scenario('typeahead', [f"{reverse('typeahead')}?q={word[:rng.randint(2, 4)]}" for word in words]),
+        Scenario('suggestions for all words', [reverse('get-suggestions-for-all-words')], authenticated=True),
+        Scenario('suggestions for word', [reverse('get-suggestions-for-specific-word', args=[busiest])], authenticated=True),
+        Scenario('moderation queue', [reverse('moderation-queue') + '?limit=50'], authenticated=True),
+        Scenario(
+            'moderation queue clustered', [reverse('moderation-queue') + '?kind=new_word&cluster=1&limit=50'],
+            authenticated=True,
+        ),
+        Scenario(
+            'like toggle', [reverse('like-vocabulary-suggestion', args=[pk]) for pk in like_ids],
+            method='post', authenticated=True,
+        ),
+        VocabularyWriteScenario('vocabulary write', [pk for pk, _ in items]),
+    ]
+
+
+def measure(scenario, user, iterations):
+    """
+    Serve `iterations` requests. The first one is reported on its own as
+    `first_ms` (cold caches and indexes); the percentiles cover the rest.
+    Peak memory comes from one extra request run under tracemalloc, so
+    tracing does not distort the timings.
+    """
+    client = Client()
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+    timings, queries, sizes = [], [], []
+    scenario.prepare()
+    for i in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            sizes.append(scenario.request(client, i, headers))
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+
+    tracemalloc.start()
+    try:
+        scenario.request(client, iterations, headers)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    warm = sorted(timings[1:] or timings)
+    result = {
+        'requests': iterations,
+        'first_ms': round(timings[0], 2),
+        'mean_ms': round(statistics.mean(warm), 2),
+        'max_ms': round(warm[-1], 2),
+        'queries_max': max(queries),
+        'queries_median': statistics.median(queries),
+        'response_bytes_median': statistics.median(sizes),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+    for p in PERCENTILES:
+        result[f'p{p}_ms'] = round(percentile(warm, p), 2)
+    return result
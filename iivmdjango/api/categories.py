@@ -0,0 +1,40 @@
+"""
+Category catalogue: distinct categories, per-category counts and the
+(id, term) list of every category, built from a single query and cached
+under the vocabulary version, so any write invalidates it.
+"""
+from . import vocabulary_cache
+from .models import VocabularyItem
+
+
+def build_catalogue():
+    members = {}
+    rows = VocabularyItem.objects.order_by('category', 'term', 'pk').values_list('category', 'pk', 'term')
+    for category, item_id, term in rows.iterator():
+        members.setdefault(category, []).append({'id': item_id, 'term': term})
+    return {
+        'categories': list(members),
+        'counts': {category: len(items) for category, items in members.items()},
+        'members': members,
+    }
+
+
+def get_catalogue():
+    return vocabulary_cache.get_or_build('category-catalogue', build_catalogue)
+
+
+def get_categories():
+    return get_catalogue()['categories']
+
+
+def get_category_counts():
+    return get_catalogue()['counts']
+
+
+def get_category_members(category):
+    """Lightweight sibling list: [{'id', 'term'}, ...] ordered by term."""
+    return get_catalogue()['members'].get(category, [])
+
+
+def get_category_item_ids(category):
+    return [member['id'] for member in get_category_members(category)]
@@ -0,0 +1,109 @@
+"""
+Append-only change log behind the `sync/` endpoint.
+
+Every vocabulary write and every saved-list change appends ChangeLogEntry
+rows in the same transaction; the auto-increment id of the newest entry is
+the sync token handed to clients. A 'reset' entry (whole-dictionary
+rewrites, log pruning) tells clients older than it to fetch everything again.
+
+A token is only safe if no entry with a lower id can still appear once it
+has been handed out, so ids must become visible in order. SQLite allows one
+writing transaction at a time, which guarantees that. PostgreSQL takes
+sequence values at insert time, and concurrent transactions may commit them
+out of order, so writers take turns: see `_lock_log`.
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ChangeLogEntry, SavedVocabularyItem, VocabularyItem
+
+# Beyond this many changed items a full download is cheaper than a diff.
+MAX_SYNC_ITEMS = 2000
+
+
+# Arbitrary application-wide key for pg_advisory_xact_lock.
+LOG_LOCK_ID = 0x6c6f67
+
+
+def _lock_log():
+    """
+    On PostgreSQL, hold a transaction-scoped lock from a writer's first
+    entry until it commits, so the next writer draws its ids only after the
+    previous ones are visible. Must run inside the writing transaction.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [LOG_LOCK_ID])
+
+
+def log_vocabulary_changes(item_ids=None):
+    with transaction.atomic(savepoint=False):
+        _lock_log()
+        if item_ids is None:
+            ChangeLogEntry.objects.create(kind='reset')
+            return
+        ChangeLogEntry.objects.bulk_create([
+            ChangeLogEntry(kind='vocabulary', vocabulary_item_id=item_id) for item_id in dict.fromkeys(item_ids)
+        ])
+
+
+def log_saved_changes(user, item_ids):
+    with transaction.atomic(savepoint=False):
+        _lock_log()
+        ChangeLogEntry.objects.bulk_create([
+            ChangeLogEntry(kind='saved', user=user, vocabulary_item_id=item_id) for item_id in dict.fromkeys(item_ids)
+        ])
+
+
+def current_token():
+    return ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def changes_since(since, user=None):
+    """
+    Return (token, changes) where `changes` is None if the client must do a
+    full resync, otherwise a dict of changed/deleted item ids and, for an
+    authenticated user, saved/unsaved item ids.
+    """
+    token = current_token()
+    entries = ChangeLogEntry.objects.filter(id__gt=since, id__lte=token)
+    if since > token or entries.filter(kind='reset').exists():
+        return token, None
+
+    changed = list(dict.fromkeys(
+        entries.filter(kind='vocabulary').values_list('vocabulary_item_id', flat=True)
+    ))
+    if len(changed) > MAX_SYNC_ITEMS:
+        return token, None
+    existing = set(VocabularyItem.objects.filter(pk__in=changed).values_list('pk', flat=True))
+    changes = {
+        'changed': [item_id for item_id in changed if item_id in existing],
+        'deleted': [item_id for item_id in changed if item_id not in existing],
+    }
+
+    if user is not None:
+        touched = list(dict.fromkeys(
+            entries.filter(kind='saved', user=user).values_list('vocabulary_item_id', flat=True)
+        ))
+        saved = set(
+            SavedVocabularyItem.objects.filter(user=user, vocabulary_item_id__in=touched)
+            .values_list('vocabulary_item_id', flat=True)
+        )
+        changes['saved'] = [item_id for item_id in touched if item_id in saved]
+        changes['unsaved'] = [item_id for item_id in touched if item_id not in saved]
+    return token, changes
+
+
+def prune(older_than_days):
+    """Drop old entries; clients holding a token from before the cut get a reset."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    last_pruned = ChangeLogEntry.objects.filter(created_at__lt=cutoff).order_by('-id').values_list('id', flat=True).first()
+    if last_pruned is None:
+        return 0
+    deleted, _ = ChangeLogEntry.objects.filter(id__lt=last_pruned).delete()
+    # The newest pruned entry stays behind as a reset marker, so only tokens
+    # from the pruned range are sent to a full resync.
+    ChangeLogEntry.objects.filter(id=last_pruned).update(kind='reset', vocabulary_item_id='', user=None)
+    return deleted
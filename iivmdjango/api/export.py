@@ -0,0 +1,74 @@
+"""
+Streaming NDJSON export of the dictionary.
+
+Items are read with a server-side cursor in primary-key order and their
+translations are prefetched one chunk at a time, so memory use depends on
+`chunk_size` rather than on the size of the dictionary.
+"""
+import json
+import zlib
+
+from django.db.models import prefetch_related_objects
+
+from .models import VocabularyItem
+from .serializers import VocabularyItemSerializer
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def iter_item_chunks(chunk_size=DEFAULT_CHUNK_SIZE):
+    chunk = []
+    for item in VocabularyItem.objects.order_by('pk').iterator(chunk_size=chunk_size):
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            prefetch_related_objects(chunk, 'translations')
+            yield chunk
+            chunk = []
+    if chunk:
+        prefetch_related_objects(chunk, 'translations')
+        yield chunk
+
+
+def iter_ndjson(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one bytes blob of newline-delimited JSON per chunk of items."""
+    for chunk in iter_item_chunks(chunk_size):
+        lines = [
+            json.dumps(VocabularyItemSerializer(item).data, ensure_ascii=False, separators=(',', ':'))
+            for item in chunk
+        ]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def gzip_stream(blobs, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for blob in blobs:
+        compressed = compressor.compress(blob)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(request):
+    """
+    Whether Accept-Encoding allows gzip: listed (or matched by `*`) with a
+    non-zero q-value, so `gzip;q=0` is a refusal.
+    """
+    qualities = {}
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, *params = part.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
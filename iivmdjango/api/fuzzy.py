@@ -0,0 +1,138 @@
+"""
+Typo-tolerant lookup using a SymSpell-style deletion dictionary.
+
+Every folded word of every term and translation is indexed under all strings
+obtained by deleting up to MAX_DISTANCE characters from its first
+PREFIX_LENGTH characters. A query word generates the same deletes, so the
+candidates within edit distance are found by dictionary lookups instead of a
+scan; each candidate is then verified with a bounded Levenshtein distance.
+"""
+from .lexicon_index import LexiconIndex, writable
+from .normalization import tokenize
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+DEFAULT_LIMIT = 50
+
+
+def max_distance_for(word):
+    # One typo in a short word already changes its meaning too often.
+    return 1 if len(word) <= 4 else MAX_DISTANCE
+
+
+def deletes(word, distance):
+    prefix = word[:PREFIX_LENGTH]
+    variants = {prefix}
+    frontier = {prefix}
+    for _ in range(distance):
+        frontier = {
+            variant[:i] + variant[i + 1:]
+            for variant in frontier if len(variant) > 1
+            for i in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+def bounded_levenshtein(a, b, limit):
+    """Levenshtein distance between a and b, or None if it exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class FuzzyIndexState:
+    def __init__(self):
+        self.items_by_word = {}
+        self.words_by_item = {}
+        self.words_by_delete = {}
+
+
+class FuzzyIndex(LexiconIndex):
+    def empty_state(self):
+        return FuzzyIndexState()
+
+    def copy_state(self, state):
+        copy = FuzzyIndexState()
+        copy.items_by_word = dict(state.items_by_word)
+        copy.words_by_item = dict(state.words_by_item)
+        copy.words_by_delete = dict(state.words_by_delete)
+        return copy
+
+    def add_entry(self, state, entry):
+        item_words = writable(state, state.words_by_item, entry.item_id)
+        for word in tokenize(entry.text):
+            item_words.add(word)
+            if word not in state.items_by_word:
+                for variant in deletes(word, MAX_DISTANCE):
+                    writable(state, state.words_by_delete, variant).add(word)
+            writable(state, state.items_by_word, word).add(entry.item_id)
+
+    def remove_item(self, state, item_id):
+        for word in state.words_by_item.pop(item_id, ()):
+            if word not in state.items_by_word:
+                continue
+            items = writable(state, state.items_by_word, word)
+            items.discard(item_id)
+            if not items:
+                del state.items_by_word[word]
+                for variant in deletes(word, MAX_DISTANCE):
+                    if variant in state.words_by_delete:
+                        words = writable(state, state.words_by_delete, variant)
+                        words.discard(word)
+                        if not words:
+                            del state.words_by_delete[variant]
+
+    def match_word(self, state, word):
+        """Return {item_id: distance} for items containing a word close to `word`."""
+        limit = max_distance_for(word)
+        candidates = set()
+        for variant in deletes(word, limit):
+            candidates.update(state.words_by_delete.get(variant, ()))
+
+        matches = {}
+        for candidate in candidates:
+            distance = bounded_levenshtein(word, candidate, limit)
+            if distance is None:
+                continue
+            for item_id in state.items_by_word[candidate]:
+                if distance < matches.get(item_id, limit + 1):
+                    matches[item_id] = distance
+        return matches
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Return item ids whose text matches every query word, closest first; `limit=None` returns all."""
+        words = tokenize(query)
+        if not words:
+            return []
+        state = self.current_state()
+
+        scores = None
+        for word in words:
+            matches = self.match_word(state, word)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    item_id: scores[item_id] + distance
+                    for item_id, distance in matches.items()
+                    if item_id in scores
+                }
+            if not scores:
+                return []
+        return sorted(scores, key=lambda item_id: (scores[item_id], item_id))[:limit]
+
+
+fuzzy_index = FuzzyIndex()
@@ -0,0 +1,276 @@
+"""
+Streaming dictionary import.
+
+Input is either a JSON array (the glossary format of
+api/mock_data/vocabulary.json) or newline-delimited JSON (one object per
+line, e.g. the output of `manage.py export_vocabulary`). Both are parsed
+incrementally, so memory use depends on the batch size rather than on the
+size of the file.
+
+Records may carry translations as a {language: text} mapping (imported as
+primary translations) or as a list of translation objects with their flags.
+Rows are written with `bulk_create`/`bulk_update` one batch at a time.
+"""
+import itertools
+import json
+import time
+
+from django.db import IntegrityError, transaction
+
+from .item_ids import assign_item_ids
+from .models import VocabularyItem, Translation
+from .signals import bulk_vocabulary_write, vocabulary_changed
+
+DEFAULT_BATCH_SIZE = 1000
+READ_SIZE = 1 << 16
+
+DEFAULT_DEFINITION = "This medical term represents a crucial concept in the field of healthcare and medical science, encompassing various aspects of human anatomy, physiology, pathology, or medical practice. It plays a vital role in the understanding, diagnosis, treatment, or prevention of diseases and health conditions. Healthcare professionals, including doctors, nurses, and specialists, frequently use this term in clinical settings to communicate effectively about patient care, medical procedures, or research findings. The concept may be applicable across multiple medical specialties, such as cardiology, neurology, oncology, or general medicine, highlighting its broad relevance in the healthcare domain. Understanding this term is essential for medical students, researchers, and practitioners, as it forms a fundamental part of medical knowledge and contributes to the development of evidence-based practices. The term may have historical significance in the evolution of medical science, possibly linked to important discoveries or advancements in healthcare. In contemporary medicine, it might be associated with cutting-edge research, innovative treatments, or emerging healthcare technologies. The implications of this term extend beyond clinical practice, potentially influencing public health policies, patient education initiatives, or healthcare management strategies. As medical science continues to evolve, the significance and application of this term may adapt, reflecting the dynamic nature of healthcare and biomedical research. Staying informed about the latest developments related to this term is crucial for healthcare professionals to provide optimal patient care and contribute to the advancement of medical knowledge."
+
+
+class InvalidImportData(ValueError):
+    pass
+
+
+def iter_json_array(stream, buffer=''):
+    """
+    Yield the elements of a top-level JSON array read from a text stream;
+    `buffer` holds characters already read from it.
+    """
+    decoder = json.JSONDecoder()
+    position = 0
+    started = False
+    eof = False
+
+    while True:
+        # Skip whitespace and separators between elements.
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position < len(buffer) or eof:
+                break
+            buffer, position = stream.read(READ_SIZE), 0
+            eof = not buffer
+        if position >= len(buffer):
+            raise InvalidImportData('Unexpected end of input inside the JSON array')
+
+        char = buffer[position]
+        if not started:
+            if char != '[':
+                raise InvalidImportData('Expected a JSON array')
+            started = True
+            position += 1
+            continue
+        if char == ']':
+            return
+        if char == ',':
+            position += 1
+            continue
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element may continue in the next chunk.
+                chunk = stream.read(READ_SIZE)
+                if not chunk:
+                    raise InvalidImportData(f'Invalid JSON near character {position}')
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            if end == len(buffer) and not eof:
+                # A number at the buffer end might still be incomplete.
+                chunk = stream.read(READ_SIZE)
+                if chunk:
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+                eof = True
+            break
+        yield value
+        position = end
+
+
+def iter_ndjson_records(stream):
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise InvalidImportData(f'Invalid JSON on line {number}: {e}')
+
+
+def iter_records(stream, format='auto'):
+    """Iterate over the records of a JSON array or NDJSON text stream."""
+    if format == 'json':
+        return iter_json_array(stream)
+    if format == 'ndjson':
+        return iter_ndjson_records(stream)
+
+    head = stream.read(1)
+    while head.isspace():
+        head = stream.read(1)
+    if head == '[':
+        return iter_json_array(stream, buffer=head)
+    return iter_ndjson_records(itertools.chain([head + stream.readline()], stream))
+
+
+def parse_translations(record):
+    """Return [(language, text, is_primary, is_colloquial, is_user_proposed)] for a record."""
+    translations = record.get('translations') or {}
+    if isinstance(translations, dict):
+        rows = [(language, text, True, False, False) for language, text in translations.items()]
+    else:
+        rows = [
+            (
+                t['language'], t['translation'],
+                bool(t.get('is_primary')), bool(t.get('is_colloquial')), bool(t.get('is_user_proposed')),
+            )
+            for t in translations
+        ]
+    if record.get('acronymExtendedName'):
+        rows.append(('en', record['acronymExtendedName'], False, False, False))
+    return rows
+
+
+class ImportStats:
+    def __init__(self):
+        self.records = 0
+        self.items_created = 0
+        self.items_updated = 0
+        self.items_deleted = 0
+        self.translations_created = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        rate = self.records / self.elapsed if self.elapsed else 0
+        return (
+            f'{self.records} record(s): {self.items_created} item(s) created, '
+            f'{self.items_updated} updated, {self.items_deleted} deleted, '
+            f'{self.translations_created} translation(s) added '
+            f'in {self.elapsed:.1f}s ({rate:.0f} records/s)'
+        )
+
+
+def iter_batches(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate(record):
+    if not isinstance(record, dict) or not record.get('term') or not record.get('category'):
+        raise InvalidImportData(f'Each record needs a term and a category: {str(record)[:200]}')
+
+
+def _write_batch(batch, stats, default_definition, seen, replace=False):
+    """
+    Match records to existing items by case-insensitive term (including
+    items created earlier in the import): update their definition/category
+    and add missing translations; insert the rest. With `replace`, items
+    matched for the first time in this import lose the translations that
+    the file does not list. Matched and created ids are added to `seen`.
+    """
+    for record in batch:
+        _validate(record)
+    # Candidates come from the database's own case folding; pairing them with
+    # records by str.lower() is then safe, as it folds at least as much.
+    existing = {
+        item.term.lower(): item
+        for item in VocabularyItem.objects.matching_terms({r['term'] for r in batch})
+    }
+    if replace:
+        reset_ids = [item.pk for item in existing.values() if item.pk not in seen]
+        Translation.objects.filter(vocabulary_item_id__in=reset_ids).delete()
+    known_translations = set(
+        Translation.objects.filter(vocabulary_item_id__in=[item.pk for item in existing.values()])
+        .values_list('vocabulary_item_id', 'language', 'translation')
+    )
+
+    new_items, changed_items, matched = [], {}, []
+    for record in batch:
+        key = record['term'].lower()
+        item = existing.get(key)
+        definition = record.get('definition') or (default_definition if replace else None)
+        if item is None:
+            item = VocabularyItem(
+                term=record['term'], definition=definition or default_definition, category=record['category'],
+            )
+            existing[key] = item
+            new_items.append(item)
+        elif (definition and item.definition != definition) or item.category != record['category']:
+            item.definition = definition or item.definition
+            item.category = record['category']
+            changed_items[item.pk] = item
+        matched.append((record, item))
+
+    # Items keep their id when matched by term, so saved lists, suggestions
+    # and client caches that refer to them survive a re-import.
+    for item, item_id in zip(new_items, assign_item_ids([(item.term, item.category) for item in new_items])):
+        item.id = item_id
+
+    translations = []
+    for record, item in matched:
+        seen.add(item.pk)
+        for language, text, is_primary, is_colloquial, is_user_proposed in parse_translations(record):
+            if (item.pk, language, text) in known_translations:
+                continue
+            known_translations.add((item.pk, language, text))
+            translations.append(Translation(
+                vocabulary_item=item, language=language, translation=text,
+                is_primary=is_primary, is_colloquial=is_colloquial, is_user_proposed=is_user_proposed,
+            ))
+
+    VocabularyItem.objects.bulk_create(new_items)
+    VocabularyItem.objects.bulk_update(changed_items.values(), ['definition', 'category'])
+    Translation.objects.bulk_create(translations)
+    stats.items_created += len(new_items)
+    stats.items_updated += len(changed_items)
+    stats.translations_created += len(translations)
+    return [item.pk for item in new_items] + list(changed_items) + [t.vocabulary_item_id for t in translations]
+
+
+def _delete_unseen_items(seen, batch_size):
+    stale = [pk for pk in VocabularyItem.objects.values_list('pk', flat=True).iterator() if pk not in seen]
+    for start in range(0, len(stale), batch_size):
+        VocabularyItem.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+    return len(stale)
+
+
+def import_vocabulary(records, mode='upsert', batch_size=DEFAULT_BATCH_SIZE,
+                      default_definition=DEFAULT_DEFINITION, progress=None):
+    """
+    Import `records` in one transaction. `mode` is 'upsert' or 'replace':
+    replace makes the dictionary match the file, deleting items (with their
+    suggestions and saved entries) that it does not list. `progress(stats)`
+    is called after every batch.
+    """
+    if mode not in ('replace', 'upsert'):
+        raise InvalidImportData(f'Unknown import mode: {mode}')
+    replace = mode == 'replace'
+    stats = ImportStats()
+    touched, seen = set(), set()
+
+    try:
+        with transaction.atomic(), bulk_vocabulary_write():
+            for batch in iter_batches(records, batch_size):
+                touched.update(_write_batch(batch, stats, default_definition, seen, replace=replace))
+                stats.records += len(batch)
+                if progress:
+                    progress(stats)
+            if replace:
+                stats.items_deleted = _delete_unseen_items(seen, batch_size)
+            vocabulary_changed(None if replace else touched)
+    except IntegrityError as e:
+        raise InvalidImportData(f'Import rolled back after {stats.records} record(s): {e}')
+    return stats
@@ -0,0 +1,56 @@
+"""
+Content-addressed vocabulary item ids.
+
+An item's id is derived from its folded term and its category, so
+re-importing the same dictionary yields the same ids and client caches,
+saved lists and sync tokens stay valid. If a candidate id is already taken
+(a hash collision, or a second item with the same term and category), it is
+re-hashed with an increasing salt until a free id is found.
+"""
+import base64
+import hashlib
+
+from .models import VocabularyItem
+from .normalization import fold
+
+ID_LENGTH = 10
+
+
+def content_id(term, category, salt=0):
+    key = f'{fold(term)}\x1f{category}'
+    if salt:
+        key = f'{key}\x1f{salt}'
+    digest = hashlib.sha256(key.encode('utf-8')).digest()
+    # Base32 keeps ids lowercase and URL-safe: 10 characters carry 50 bits.
+    return base64.b32encode(digest).decode('ascii').lower()[:ID_LENGTH]
+
+
+def assign_item_ids(pairs):
+    """
+    Return an unused id for each (term, category) pair, in order. Costs one
+    query, plus one more per round of collisions.
+    """
+    ids = [None] * len(pairs)
+    salts = [0] * len(pairs)
+    assigned = set()
+    pending = list(range(len(pairs)))
+    while pending:
+        candidates = {index: content_id(*pairs[index], salt=salts[index]) for index in pending}
+        in_use = set(
+            VocabularyItem.objects.filter(pk__in=set(candidates.values())).values_list('pk', flat=True)
+        )
+        retry = []
+        for index in pending:
+            candidate = candidates[index]
+            if candidate in in_use or candidate in assigned:
+                salts[index] += 1
+                retry.append(index)
+            else:
+                assigned.add(candidate)
+                ids[index] = candidate
+        pending = retry
+    return ids
+
+
+def new_item_id(term, category):
+    return assign_item_ids([(term, category)])[0]
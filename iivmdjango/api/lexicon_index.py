@@ -0,0 +1,189 @@
+"""
+Base class for in-process indexes over vocabulary terms and translations.
+
+An index is built lazily on first use from two `values_list` queries and then
+kept current in two ways:
+
+* the worker that performs a write refreshes just the touched items once the
+  transaction commits (see `api.signals.vocabulary_changed`);
+* every other worker notices that the shared vocabulary version moved on and
+  rebuilds in a background thread, serving the previous snapshot meanwhile.
+
+A published state is never changed: readers use it without locking, so both
+paths build a new state and publish it with a single assignment.
+
+Both paths cost time proportional to the index, not to the write. A refresh
+copies the top-level containers of the state (one dict entry per item or
+word), so the items touched by one transaction are collected and refreshed
+together on commit (`schedule_refresh`). Other workers pay a full build per
+version change, at most one at a time: a burst of writes costs each of
+them one or two rebuilds, not one per write. `manage.py benchmark_api
+--scenarios "vocabulary write"` measures the writing side.
+"""
+import threading
+from collections import namedtuple
+
+from django.db import connection, transaction
+
+from . import vocabulary_cache
+from .models import VocabularyItem, Translation
+
+LexiconEntry = namedtuple('LexiconEntry', ['item_id', 'text', 'language', 'kind'])
+
+TERM_LANGUAGE = 'en'
+
+
+def iter_entries(item_ids=None):
+    items = VocabularyItem.objects.all()
+    translations = Translation.objects.all()
+    if item_ids is not None:
+        items = items.filter(pk__in=item_ids)
+        translations = translations.filter(vocabulary_item_id__in=item_ids)
+    for item_id, term in items.values_list('pk', 'term').iterator():
+        yield LexiconEntry(item_id, term, TERM_LANGUAGE, 'term')
+    for item_id, text, language in translations.values_list('vocabulary_item_id', 'translation', 'language').iterator():
+        yield LexiconEntry(item_id, text, language, 'translation')
+
+
+def writable(state, mapping, key, factory=set):
+    """
+    The container at `mapping[key]`, created with `factory()` if missing,
+    that may be changed in place. In a state being refreshed (see
+    `LexiconIndex.copy_state`) a container inherited from the published
+    state is replaced by a copy the first time it is asked for.
+    """
+    value = mapping.get(key)
+    copied = getattr(state, 'copied', None)
+    if copied is not None:
+        marker = (id(mapping), key)
+        if marker not in copied:
+            copied.add(marker)
+            if value is not None:
+                value = mapping[key] = factory(value)
+    if value is None:
+        value = mapping[key] = factory()
+    return value
+
+
+class LexiconIndex:
+    """
+    Subclasses describe their storage through `empty_state`, `copy_state`,
+    `add_entry`, `remove_item` and optionally `finalize_state`; readers use
+    `current_state()`. Full builds fill a fresh state and swap it in, so
+    queries never wait for a rebuild; `add_entry` and `remove_item` change
+    nested containers only through `writable()`. Indexes over something
+    other than the vocabulary override `iter_entries` and `shared_version`.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._state = None
+        self._version = None
+        self._rebuilding = False
+        self._pending = threading.local()
+
+    def empty_state(self):
+        raise NotImplementedError
+
+    def copy_state(self, state):
+        """
+        A new state sharing `state`'s data: top-level containers are
+        copied, nested ones are left to `writable()`.
+        """
+        raise NotImplementedError
+
+    def add_entry(self, state, entry):
+        raise NotImplementedError
+
+    def remove_item(self, state, item_id):
+        raise NotImplementedError
+
+    def finalize_state(self, state):
+        """Hook run once after a full build, before the state is published."""
+
+    def iter_entries(self, item_ids=None):
+        return iter_entries(item_ids)
+
+    def shared_version(self):
+        return vocabulary_cache.get_version()
+
+    def build(self):
+        version = self.shared_version()
+        state = self.empty_state()
+        for entry in self.iter_entries():
+            self.add_entry(state, entry)
+        self.finalize_state(state)
+        with self._lock:
+            self._state = state
+            self._version = version
+
+    def current_state(self):
+        if self._state is None:
+            with self._lock:
+                if self._state is None:
+                    self.build()
+        elif self._version != self.shared_version() and not self._rebuilding:
+            self._rebuilding = True
+            threading.Thread(target=self._background_rebuild, daemon=True).start()
+        return self._state
+
+    def _background_rebuild(self):
+        try:
+            self.build()
+        finally:
+            self._rebuilding = False
+            connection.close()
+
+    def refresh_items(self, item_ids):
+        """Re-read the given items; a no-op until the index is first built."""
+        if self._state is None:
+            return
+        item_ids = set(item_ids)
+        entries = list(self.iter_entries(item_ids))
+        with self._lock:
+            if self._state is None:
+                return
+            state = self.copy_state(self._state)
+            state.copied = set()
+            for item_id in item_ids:
+                self.remove_item(state, item_id)
+            for entry in entries:
+                self.add_entry(state, entry)
+            state.copied = None
+            self._state = state
+            self._version = self.shared_version()
+
+    def schedule_refresh(self, item_ids):
+        """
+        Refresh `item_ids` once the current transaction commits. Ids
+        scheduled by several writes of a thread are refreshed together by
+        the first callback to run, so a commit copies the state once.
+        """
+        pending = getattr(self._pending, 'item_ids', None)
+        if not pending or not self._refresh_scheduled():
+            # Ids not awaiting a callback belong to a rolled back transaction.
+            pending = self._pending.item_ids = set()
+        pending.update(item_ids)
+        transaction.on_commit(self._refresh_pending)
+
+    def _refresh_scheduled(self):
+        # The latest callbacks are checked first; in a transaction that
+        # keeps writing, this index's previous one is among them.
+        return any(entry[1] == self._refresh_pending for entry in reversed(connection.run_on_commit))
+
+    def _refresh_pending(self):
+        item_ids = getattr(self._pending, 'item_ids', None)
+        if item_ids:
+            self._pending.item_ids = set()
+            self.refresh_items(item_ids)
+        else:
+            # A later callback of a commit that was refreshed already: take
+            # in the version bumps made since, which would otherwise look
+            # like another worker's write and start a full rebuild.
+            with self._lock:
+                if self._state is not None:
+                    self._version = self.shared_version()
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
@@ -0,0 +1,124 @@
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from api.benchmark import BenchmarkFailed, build_scenarios, generate_dataset, measure
+
+# The benchmark must never read or bump the versions of a shared cache.
+ISOLATED_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-api'}}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate synthetic dictionaries in a scratch database and measure the main API endpoints '
+        'through the Django test client: latency percentiles, query counts, response size and peak '
+        'memory. Results are written as JSON so runs from different commits can be compared.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated dictionary sizes.')
+        parser.add_argument('--iterations', type=int, default=20, help='Requests per scenario (default 20).')
+        parser.add_argument('--scenarios', help='Comma-separated scenario names to run (default all).')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', '-o', help='JSON file to write (default benchmark-api-<commit>.json).')
+        parser.add_argument('--compare', help='Earlier JSON result to print changes against.')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes must be comma-separated integers')
+        if options['iterations'] < 1 or min(sizes) < 1:
+            raise CommandError('--iterations and --sizes must be positive')
+        only = set(options['scenarios'].split(',')) if options['scenarios'] else None
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                baseline = json.load(f)['results']
+
+        commit = git_commit()
+        report = {
+            'commit': commit,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'seed': options['seed'],
+            'results': {},
+        }
+        isolated = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            CACHES=ISOLATED_CACHES,
+            VOCABULARY_CACHE={**getattr(settings, 'VOCABULARY_CACHE', {}), 'ALIAS': 'default'},
+        )
+        with isolated:
+            self.with_scratch_database(lambda: self.run_sizes(sizes, only, options, report, baseline))
+
+        output = options['output'] or f"benchmark-api-{commit or 'unknown'}.json"
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(f'Wrote {output}')
+
+    def with_scratch_database(self, run):
+        # A throwaway database, on disk for SQLite so I/O is part of the numbers.
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            run()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run_sizes(self, sizes, only, options, report, baseline):
+        for size in sizes:
+            call_command('flush', interactive=False, verbosity=0)
+            self.stdout.write(f'Generating {size} terms...')
+            user = generate_dataset(size, seed=options['seed'])[0]
+            results = report['results'][str(size)] = {}
+            for scenario in build_scenarios(seed=options['seed']):
+                if only is not None and scenario.name not in only:
+                    continue
+                try:
+                    result = measure(scenario, user, options['iterations'])
+                except BenchmarkFailed as e:
+                    raise CommandError(str(e))
+                results[scenario.name] = result
+                previous = (baseline or {}).get(str(size), {}).get(scenario.name)
+                self.stdout.write(f'  {scenario.name}: {self.describe(result, previous)}')
+
+    def describe(self, result, previous=None):
+        line = (
+            f"p50 {result['p50_ms']}ms p95 {result['p95_ms']}ms first {result['first_ms']}ms, "
+            f"{result['queries_max']} queries, {result['peak_memory_kb']}KB peak"
+        )
+        if previous:
+            changes = []
+            for key in ('p50_ms', 'p95_ms'):
+                if previous.get(key):
+                    changes.append(f'{key[:3]} {(result[key] - previous[key]) / previous[key]:+.0%}')
+            if previous.get('queries_max') is not None and previous['queries_max'] != result['queries_max']:
+                changes.append(f"queries {previous['queries_max']} -> {result['queries_max']}")
+            line += f" ({', '.join(changes) or 'unchanged'})"
+        return line
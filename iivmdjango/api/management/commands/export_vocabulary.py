@@ -0,0 +1,28 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api.export import DEFAULT_CHUNK_SIZE, gzip_stream, iter_ndjson
+
+
+class Command(BaseCommand):
+    help = 'Stream the dictionary as newline-delimited JSON (one vocabulary item per line).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help='File to write to (defaults to stdout).')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output on the fly.')
+
+    def handle(self, *args, **options):
+        blobs = iter_ndjson(options['chunk_size'])
+        if options['gzip']:
+            blobs = gzip_stream(blobs)
+
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for blob in blobs:
+                    output.write(blob)
+        else:
+            for blob in blobs:
+                sys.stdout.buffer.write(blob)
+            sys.stdout.buffer.flush()
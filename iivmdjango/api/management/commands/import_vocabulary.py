@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importer import DEFAULT_BATCH_SIZE, InvalidImportData, import_vocabulary, iter_records
+
+
+class Command(BaseCommand):
+    help = 'Import a dictionary from a JSON array or NDJSON file, streaming it in bulk batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin.")
+        parser.add_argument('--format', choices=['auto', 'json', 'ndjson'], default='auto')
+        parser.add_argument(
+            '--mode', choices=['upsert', 'replace'], default='upsert',
+            help='upsert (default) merges by term; replace also drops translations and items the file does not list.',
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        def progress(stats):
+            self.stderr.write(f'  {stats.records} record(s) after {stats.elapsed:.1f}s')
+
+        stream = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8')
+        try:
+            stats = import_vocabulary(
+                iter_records(stream, options['format']),
+                mode=options['mode'],
+                batch_size=options['batch_size'],
+                progress=progress if options['verbosity'] > 1 else None,
+            )
+        except InvalidImportData as e:
+            raise CommandError(str(e))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(f'Imported {stats.summary()}')
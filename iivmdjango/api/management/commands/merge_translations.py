@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importer import DEFAULT_BATCH_SIZE, InvalidImportData, iter_records
+from api.translation_merge import merge_translations
+
+
+class Command(BaseCommand):
+    help = 'Merge translations from a JSON array or NDJSON file into existing vocabulary items, matched by id.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to merge, or '-' for stdin.")
+        parser.add_argument('--format', choices=['auto', 'json', 'ndjson'], default='auto')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        stream = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8')
+        try:
+            stats = merge_translations(
+                iter_records(stream, options['format']),
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+            )
+        except InvalidImportData as e:
+            raise CommandError(str(e))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        if options['dry_run']:
+            self.stdout.write('Dry run, nothing was written.')
+        self.stdout.write(stats.summary())
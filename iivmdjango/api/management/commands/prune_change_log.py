@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import changelog
+
+
+class Command(BaseCommand):
+    help = 'Delete sync change log entries older than --days; older client tokens then get a full resync.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Keep entries from the last N days (default 30).')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            deleted = changelog.prune(options['days'])
+        self.stdout.write(f'Pruned {deleted} change log entrie(s)')
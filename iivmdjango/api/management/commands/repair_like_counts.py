@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+
+from api.models import NewWordSuggestion, SuggestionToVocabularyItem
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored like_count of every suggestion from the likes table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report counters that are out of sync.')
+
+    def handle(self, *args, **options):
+        for model in (NewWordSuggestion, SuggestionToVocabularyItem):
+            drifted = model.objects.annotate(actual=Count('likes')).exclude(like_count=F('actual')).count()
+            if drifted and not options['dry_run']:
+                with transaction.atomic():
+                    model.objects.recount_likes()
+            verb = 'out of sync' if options['dry_run'] else 'repaired'
+            self.stdout.write(f'{model.__name__}: {drifted} counter(s) {verb}')
@@ -0,0 +1,26 @@
+import os
+
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from djangobackend.permissions import IsOverseer
+from . import request_metrics
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsOverseer])
+def getRequestStats(request):
+    """
+    Per-route timings collected by RequestMetricsMiddleware in the worker
+    process that serves this request; DELETE starts a new window.
+    """
+    if request.method == 'DELETE':
+        request_metrics.store.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response({
+        'enabled': request_metrics.get_setting('ENABLED'),
+        'pid': os.getpid(),
+        'since': request_metrics.store.since.isoformat(timespec='seconds'),
+        'n_plus_one_threshold': request_metrics.get_setting('N_PLUS_ONE_THRESHOLD'),
+        'routes': request_metrics.store.snapshot(),
+    })
@@ -0,0 +1,79 @@
+import re
+import unicodedata
+
+from django.db import migrations
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE api_vocabulary_search USING fts5("
+    "item_id UNINDEXED, term, translations, definition, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+]
+
+POSTGRES_CREATE = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE TABLE api_vocabulary_search ('
+    'item_id varchar(10) PRIMARY KEY, term text NOT NULL, translations text NOT NULL, '
+    'definition text NOT NULL, document tsvector NOT NULL)',
+    'CREATE INDEX api_vocabulary_search_document ON api_vocabulary_search USING gin (document)',
+    "CREATE INDEX api_vocabulary_search_trgm ON api_vocabulary_search "
+    "USING gin ((term || ' ' || translations) gin_trgm_ops)",
+]
+
+EXTRA_FOLDS = str.maketrans({'ł': 'l', 'đ': 'd', 'ø': 'o', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe'})
+
+
+def fold(text):
+    # Frozen copy of api.normalization.fold at the time of this migration.
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return re.sub(r'\s+', ' ', stripped.translate(EXTRA_FOLDS)).strip()
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        statements = SQLITE_CREATE
+        insert_sql = (
+            'INSERT INTO api_vocabulary_search (item_id, term, translations, definition) '
+            'VALUES (%s, %s, %s, %s)'
+        )
+    elif vendor == 'postgresql':
+        statements = POSTGRES_CREATE
+        insert_sql = (
+            'INSERT INTO api_vocabulary_search (item_id, term, translations, definition, document) '
+            "VALUES (%s, %s, %s, %s, setweight(to_tsvector('simple', %s), 'A') || "
+            "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'C'))"
+        )
+    else:
+        return
+
+    for statement in statements:
+        schema_editor.execute(statement)
+
+    VocabularyItem = apps.get_model('api', 'VocabularyItem')
+    rows = []
+    for item in VocabularyItem.objects.prefetch_related('translations'):
+        translations = ' '.join(t.translation for t in item.translations.all())
+        row = (item.pk, fold(item.term), fold(translations), fold(item.definition))
+        rows.append(row if vendor == 'sqlite' else row + row[1:])
+    if rows:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(insert_sql, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE IF EXISTS api_vocabulary_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_remove_vocabularyitem_colloquial_terms_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
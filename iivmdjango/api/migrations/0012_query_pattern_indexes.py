@@ -0,0 +1,141 @@
+# Generated by Django 3.2.12 on 2026-10-18 07:55
+
+import logging
+import re
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+import django.db.models.functions.text
+
+logger = logging.getLogger(__name__)
+
+EXTRA_FOLDS = str.maketrans({'ł': 'l', 'đ': 'd', 'ø': 'o', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe'})
+
+
+def fold(text):
+    # Frozen copy of api.normalization.fold at the time of this migration.
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return re.sub(r'\s+', ' ', stripped.translate(EXTRA_FOLDS)).strip()
+
+
+def reindex_search_rows(schema_editor, item, removed_ids):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        insert_sql = (
+            'INSERT INTO api_vocabulary_search (item_id, term, translations, definition) '
+            'VALUES (%s, %s, %s, %s)'
+        )
+    elif vendor == 'postgresql':
+        insert_sql = (
+            'INSERT INTO api_vocabulary_search (item_id, term, translations, definition, document) '
+            "VALUES (%s, %s, %s, %s, setweight(to_tsvector('simple', %s), 'A') || "
+            "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'C'))"
+        )
+    else:
+        return
+    translations = ' '.join(item.translations.values_list('translation', flat=True))
+    row = (item.pk, fold(item.term), fold(translations), fold(item.definition))
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany('DELETE FROM api_vocabulary_search WHERE item_id = %s', [(pk,) for pk in [item.pk, *removed_ids]])
+        cursor.execute(insert_sql, row if vendor == 'sqlite' else row + row[1:])
+
+
+def merge_case_duplicates(apps, schema_editor):
+    # Terms that differ only by case would make the unique index below fail.
+    # Each group is merged into its first item by id, which takes over the
+    # translations, suggestions and saved-item entries of the others.
+    VocabularyItem = apps.get_model('api', 'VocabularyItem')
+    Translation = apps.get_model('api', 'Translation')
+    SuggestionToVocabularyItem = apps.get_model('api', 'SuggestionToVocabularyItem')
+    UserProfile = apps.get_model('djangobackend', 'UserProfile')
+    items = VocabularyItem.objects.annotate(term_lower=Lower('term'))
+    duplicated = list(
+        items.order_by().values('term_lower').annotate(count=Count('pk'))
+        .filter(count__gt=1).values_list('term_lower', flat=True)
+    )
+    merged_into = {}
+    for term_lower in duplicated:
+        keeper, *others = items.filter(term_lower=term_lower).order_by('pk')
+        other_ids = [item.pk for item in others]
+        merged_into.update(dict.fromkeys(other_ids, keeper.pk))
+        existing = set(Translation.objects.filter(vocabulary_item=keeper).values_list('language', 'translation'))
+        moved = []
+        for pk, language, text in (
+            Translation.objects.filter(vocabulary_item_id__in=other_ids).order_by('pk')
+            .values_list('pk', 'language', 'translation')
+        ):
+            # Translations the keeper already has go with the deleted items.
+            if (language, text) not in existing:
+                existing.add((language, text))
+                moved.append(pk)
+        Translation.objects.filter(pk__in=moved).update(vocabulary_item=keeper)
+        SuggestionToVocabularyItem.objects.filter(vocabulary_item_id__in=other_ids).update(vocabulary_item=keeper)
+        VocabularyItem.objects.filter(pk__in=other_ids).delete()
+        reindex_search_rows(schema_editor, keeper, other_ids)
+        logger.warning('Merged vocabulary items %s into %r (%s)', other_ids, keeper.pk, keeper.term)
+
+    if merged_into:
+        # Saved lists would otherwise lose the merged ids when they are
+        # copied into SavedVocabularyItem.
+        for profile in UserProfile.objects.only('savedVocabulary').iterator():
+            saved = profile.savedVocabulary or []
+            if any(item_id in merged_into for item_id in saved):
+                profile.savedVocabulary = list(dict.fromkeys(merged_into.get(item_id, item_id) for item_id in saved))
+                profile.save(update_fields=['savedVocabulary'])
+
+    if duplicated:
+        # Retire cached payloads that still list the merged items.
+        alias = getattr(settings, 'VOCABULARY_CACHE', {}).get('ALIAS', 'default')
+        caches[alias].delete_many(['vocabulary:version', 'vocabulary:modified'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_vocabulary_search_index'),
+        # UserProfile.savedVocabulary is rewritten for merged items.
+        ('djangobackend', '0004_userprofile_delete_customuser'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newwordsuggestion',
+            index=models.Index(django.db.models.functions.text.Lower('term'), name='api_newword_term_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newwordsuggestion',
+            index=models.Index(fields=['status'], name='api_newword_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suggestiontovocabularyitem',
+            index=models.Index(fields=['status'], name='api_vocabsugg_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suggestiontovocabularyitem',
+            index=models.Index(fields=['vocabulary_item', 'status'], name='api_vocabsugg_item_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='translation',
+            index=models.Index(fields=['language', 'is_primary'], name='api_translation_lang_prim_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vocabularyitem',
+            index=models.Index(fields=['term'], name='api_vocab_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vocabularyitem',
+            index=models.Index(fields=['category', 'term'], name='api_vocab_category_term_idx'),
+        ),
+        migrations.RunPython(merge_case_duplicates, migrations.RunPython.noop),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX api_vocab_term_ci_unique ON api_vocabularyitem (LOWER(term))',
+            'DROP INDEX api_vocab_term_ci_unique',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.12 on 2026-10-18 07:56
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_like_counts(apps, schema_editor):
+    for model_name in ('NewWordSuggestion', 'SuggestionToVocabularyItem'):
+        model = apps.get_model('api', model_name)
+        counts = model.objects.annotate(count=Count('likes')).filter(count__gt=0).values_list('pk', 'count')
+        for pk, count in counts:
+            model.objects.filter(pk=pk).update(like_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newwordsuggestion',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='suggestiontovocabularyitem',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_like_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.12 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_suggestion_like_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newwordsuggestion',
+            index=models.Index(fields=['status', '-like_count', '-id'], name='api_newword_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suggestiontovocabularyitem',
+            index=models.Index(fields=['status', '-like_count', '-id'], name='api_vocabsugg_queue_idx'),
+        ),
+    ]
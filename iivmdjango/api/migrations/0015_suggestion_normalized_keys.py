@@ -0,0 +1,73 @@
+# Generated by Django 3.2.12 on 2026-10-18 08:00
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+EXTRA_FOLDS = str.maketrans({'ł': 'l', 'đ': 'd', 'ø': 'o', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe'})
+
+
+def fold(text):
+    # Frozen copy of api.normalization.fold at the time of this migration.
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return re.sub(r'\s+', ' ', stripped.translate(EXTRA_FOLDS)).strip()
+
+
+def backfill_normalized_keys(apps, schema_editor):
+    # The oldest row of each duplicate group keeps the key; later duplicates
+    # stay NULL so the unique constraints can be created.
+    NewWordSuggestion = apps.get_model('api', 'NewWordSuggestion')
+    seen = set()
+    for pk, term in NewWordSuggestion.objects.order_by('pk').values_list('pk', 'term').iterator():
+        key = fold(term)
+        if key not in seen:
+            seen.add(key)
+            NewWordSuggestion.objects.filter(pk=pk).update(normalized_term=key)
+
+    SuggestionToVocabularyItem = apps.get_model('api', 'SuggestionToVocabularyItem')
+    seen = set()
+    rows = SuggestionToVocabularyItem.objects.order_by('pk').values_list(
+        'pk', 'vocabulary_item_id', 'suggestion_type', 'language', 'suggestion'
+    )
+    for pk, item_id, suggestion_type, language, suggestion in rows.iterator():
+        key = (item_id, suggestion_type, language, fold(suggestion))
+        if key not in seen:
+            seen.add(key)
+            SuggestionToVocabularyItem.objects.filter(pk=pk).update(normalized_suggestion=key[3])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_moderation_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='newwordsuggestion',
+            name='api_newword_term_lower_idx',
+        ),
+        migrations.AddField(
+            model_name='newwordsuggestion',
+            name='normalized_term',
+            field=models.CharField(editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='suggestiontovocabularyitem',
+            name='normalized_suggestion',
+            field=models.TextField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_normalized_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='newwordsuggestion',
+            constraint=models.UniqueConstraint(fields=('normalized_term',), name='api_newword_normalized_term_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='suggestiontovocabularyitem',
+            constraint=models.UniqueConstraint(fields=('vocabulary_item', 'suggestion_type', 'language', 'normalized_suggestion'), name='api_vocabsugg_normalized_unique'),
+        ),
+    ]
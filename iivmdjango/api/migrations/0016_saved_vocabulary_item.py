@@ -0,0 +1,59 @@
+# Generated by Django 3.2.12 on 2026-10-18 08:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_saved_vocabulary(apps, schema_editor):
+    UserProfile = apps.get_model('djangobackend', 'UserProfile')
+    VocabularyItem = apps.get_model('api', 'VocabularyItem')
+    SavedVocabularyItem = apps.get_model('api', 'SavedVocabularyItem')
+    existing = set(VocabularyItem.objects.values_list('pk', flat=True))
+    for user_id, saved in UserProfile.objects.values_list('user_id', 'savedVocabulary').iterator():
+        # Ids of items deleted since they were saved are dropped.
+        item_ids = [item_id for item_id in dict.fromkeys(saved or []) if item_id in existing]
+        SavedVocabularyItem.objects.bulk_create(
+            [SavedVocabularyItem(user_id=user_id, vocabulary_item_id=item_id) for item_id in item_ids],
+            ignore_conflicts=True,
+        )
+
+
+def copy_saved_vocabulary_back(apps, schema_editor):
+    UserProfile = apps.get_model('djangobackend', 'UserProfile')
+    SavedVocabularyItem = apps.get_model('api', 'SavedVocabularyItem')
+    saved = {}
+    for user_id, item_id in SavedVocabularyItem.objects.order_by('pk').values_list('user_id', 'vocabulary_item_id'):
+        saved.setdefault(user_id, []).append(item_id)
+    for user_id, item_ids in saved.items():
+        UserProfile.objects.filter(user_id=user_id).update(savedVocabulary=item_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0015_suggestion_normalized_keys'),
+        ('djangobackend', '0007_userprofile_user_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedVocabularyItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('saved_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_vocabulary_items', to=settings.AUTH_USER_MODEL)),
+                ('vocabulary_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_by', to='api.vocabularyitem')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='savedvocabularyitem',
+            index=models.Index(fields=['user', '-id'], name='api_saved_user_recent_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='savedvocabularyitem',
+            constraint=models.UniqueConstraint(fields=('user', 'vocabulary_item'), name='api_saved_user_item_unique'),
+        ),
+        migrations.RunPython(copy_saved_vocabulary, copy_saved_vocabulary_back),
+    ]
@@ -0,0 +1,124 @@
+import base64
+import hashlib
+import re
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+EXTRA_FOLDS = str.maketrans({'ł': 'l', 'đ': 'd', 'ø': 'o', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe'})
+CHUNK_SIZE = 250
+
+
+def fold(text):
+    # Frozen copy of api.normalization.fold at the time of this migration.
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return re.sub(r'\s+', ' ', stripped.translate(EXTRA_FOLDS)).strip()
+
+
+def content_id(term, category, salt=0):
+    # Frozen copy of api.item_ids.content_id at the time of this migration.
+    key = f'{fold(term)}\x1f{category}'
+    if salt:
+        key = f'{key}\x1f{salt}'
+    digest = hashlib.sha256(key.encode('utf-8')).digest()
+    return base64.b32encode(digest).decode('ascii').lower()[:10]
+
+
+def remap_case(field, pairs):
+    return Case(*[When(**{field: old}, then=Value(new)) for old, new in pairs], output_field=models.CharField())
+
+
+def rebuild_search_index(apps, schema_editor):
+    # item_id is UNINDEXED in the SQLite FTS table, so updating it row by row
+    # would scan the whole table for every item: refill it in one pass.
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        insert_sql = (
+            'INSERT INTO api_vocabulary_search (item_id, term, translations, definition) '
+            'VALUES (%s, %s, %s, %s)'
+        )
+    elif vendor == 'postgresql':
+        insert_sql = (
+            'INSERT INTO api_vocabulary_search (item_id, term, translations, definition, document) '
+            "VALUES (%s, %s, %s, %s, setweight(to_tsvector('simple', %s), 'A') || "
+            "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'C'))"
+        )
+    else:
+        return
+
+    VocabularyItem = apps.get_model('api', 'VocabularyItem')
+    Translation = apps.get_model('api', 'Translation')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DELETE FROM api_vocabulary_search')
+        items = list(VocabularyItem.objects.order_by('pk').values_list('pk', 'term', 'definition'))
+        for start in range(0, len(items), CHUNK_SIZE):
+            chunk = items[start:start + CHUNK_SIZE]
+            translations = {}
+            rows = Translation.objects.filter(vocabulary_item_id__in=[pk for pk, _, _ in chunk]).order_by('pk')
+            for item_id, text in rows.values_list('vocabulary_item_id', 'translation'):
+                translations.setdefault(item_id, []).append(text)
+            rows = []
+            for pk, term, definition in chunk:
+                row = (pk, fold(term), fold(' '.join(translations.get(pk, []))), fold(definition))
+                rows.append(row if vendor == 'sqlite' else row + row[1:])
+            cursor.executemany(insert_sql, rows)
+
+
+def remap_item_ids(apps, schema_editor):
+    VocabularyItem = apps.get_model('api', 'VocabularyItem')
+    taken = set(VocabularyItem.objects.values_list('pk', flat=True))
+    remap = []
+    for pk, term, category in VocabularyItem.objects.order_by('pk').values_list('pk', 'term', 'category').iterator():
+        salt = 0
+        while True:
+            candidate = content_id(term, category, salt)
+            if candidate == pk:
+                break
+            if candidate not in taken:
+                taken.add(candidate)
+                remap.append((pk, candidate))
+                break
+            salt += 1
+    if not remap:
+        return
+
+    related = [
+        apps.get_model('api', 'Translation'),
+        apps.get_model('api', 'SuggestionToVocabularyItem'),
+        apps.get_model('api', 'SavedVocabularyItem'),
+        apps.get_model('api', 'ChangeLogEntry'),
+    ]
+    for start in range(0, len(remap), CHUNK_SIZE):
+        pairs = remap[start:start + CHUNK_SIZE]
+        new_ids = dict(pairs)
+        # Foreign keys are deferred until commit, so the items can be
+        # renamed in place before their references are moved.
+        VocabularyItem.objects.filter(pk__in=new_ids).update(id=remap_case('id', pairs))
+        for model in related:
+            model.objects.filter(vocabulary_item_id__in=new_ids).update(
+                vocabulary_item_id=remap_case('vocabulary_item_id', pairs)
+            )
+    rebuild_search_index(apps, schema_editor)
+
+    # Clients still hold the old ids: send every sync client to a full
+    # download and retire cached payloads by dropping the shared version.
+    apps.get_model('api', 'ChangeLogEntry').objects.create(kind='reset')
+    alias = getattr(settings, 'VOCABULARY_CACHE', {}).get('ALIAS', 'default')
+    caches[alias].delete_many(['vocabulary:version', 'vocabulary:modified'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_change_log'),
+    ]
+
+    operations = [
+        migrations.RunPython(remap_item_ids, migrations.RunPython.noop),
+    ]
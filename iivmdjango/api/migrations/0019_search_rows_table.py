@@ -0,0 +1,60 @@
+from django.db import migrations
+
+# On SQLite the FTS5 table becomes an external-content index over a regular
+# table with a unique item_id, so re-indexing an item deletes by key instead
+# of scanning the UNINDEXED item_id column of the whole FTS table. Triggers
+# keep the index in step with the content table.
+SQLITE_FORWARD = [
+    'CREATE TABLE api_vocabulary_search_rows ('
+    'id INTEGER PRIMARY KEY, item_id TEXT NOT NULL UNIQUE, '
+    'term TEXT NOT NULL, translations TEXT NOT NULL, definition TEXT NOT NULL)',
+    'INSERT INTO api_vocabulary_search_rows (item_id, term, translations, definition) '
+    'SELECT item_id, term, translations, definition FROM api_vocabulary_search',
+    'DROP TABLE api_vocabulary_search',
+    "CREATE VIRTUAL TABLE api_vocabulary_search USING fts5("
+    "item_id UNINDEXED, term, translations, definition, "
+    "content = 'api_vocabulary_search_rows', content_rowid = 'id', "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    "INSERT INTO api_vocabulary_search (api_vocabulary_search) VALUES ('rebuild')",
+    'CREATE TRIGGER api_vocabulary_search_insert AFTER INSERT ON api_vocabulary_search_rows BEGIN '
+    'INSERT INTO api_vocabulary_search (rowid, item_id, term, translations, definition) '
+    'VALUES (new.id, new.item_id, new.term, new.translations, new.definition); END',
+    'CREATE TRIGGER api_vocabulary_search_delete AFTER DELETE ON api_vocabulary_search_rows BEGIN '
+    'INSERT INTO api_vocabulary_search (api_vocabulary_search, rowid, item_id, term, translations, definition) '
+    "VALUES ('delete', old.id, old.item_id, old.term, old.translations, old.definition); END",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER api_vocabulary_search_insert',
+    'DROP TRIGGER api_vocabulary_search_delete',
+    'DROP TABLE api_vocabulary_search',
+    "CREATE VIRTUAL TABLE api_vocabulary_search USING fts5("
+    "item_id UNINDEXED, term, translations, definition, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    'INSERT INTO api_vocabulary_search (item_id, term, translations, definition) '
+    'SELECT item_id, term, translations, definition FROM api_vocabulary_search_rows',
+    'DROP TABLE api_vocabulary_search_rows',
+]
+
+
+def add_rows_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_FORWARD:
+            schema_editor.execute(statement)
+
+
+def remove_rows_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_BACKWARD:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_content_addressed_item_ids'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_rows_table, remove_rows_table),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.12 on 2026-10-18 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_search_rows_table'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='newwordsuggestion',
+            name='normalized_term',
+            field=models.TextField(editable=False, null=True),
+        ),
+    ]
@@ -1,12 +1,39 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import BooleanField, Count, Exists, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Lower
 from django.contrib.auth.models import User
 
+from .normalization import fold
+
+class VocabularyItemQuerySet(models.QuerySet):
+    def matching_terms(self, terms):
+        """
+        Items whose term equals one of `terms` under the database's LOWER(),
+        i.e. the items api_vocab_term_ci_unique would reject them against.
+        Both sides are lowered by the database: on SQLite LOWER() only folds
+        ASCII, so Python's str.lower() keys would miss non-ASCII terms.
+        """
+        return self.annotate(term_lower=Lower('term')).filter(
+            term_lower__in=[Lower(Value(term)) for term in terms]
+        )
+
 class VocabularyItem(models.Model):
     id = models.CharField(max_length=10, primary_key=True)
     term = models.CharField(max_length=100)
     definition = models.CharField(max_length=1000)
     category = models.CharField(max_length=100)
 
+    objects = VocabularyItemQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term'], name='api_vocab_term_idx'),
+            models.Index(fields=['category', 'term'], name='api_vocab_category_term_idx'),
+        ]
+        # A case-insensitive unique index on LOWER(term) (api_vocab_term_ci_unique)
+        # is created with RunSQL in migration 0012: Django 3.2 cannot express
+        # functional unique constraints.
+
     def __str__(self):
         return self.term
 
@@ -20,10 +47,64 @@ class Translation(models.Model):
 
     class Meta:
         unique_together = ['vocabulary_item', 'language', 'translation']
+        indexes = [
+            models.Index(fields=['language', 'is_primary'], name='api_translation_lang_prim_idx'),
+        ]
 
     def __str__(self):
         return f"{self.vocabulary_item.term} - {self.language}: {self.translation}"
 
+class SuggestionQuerySet(models.QuerySet):
+    def _like_filter(self, pk, user):
+        return {f'{self.model._meta.model_name}_id': pk, 'user_id': user.pk}
+
+    def with_like_info(self, user):
+        """Annotate liked_by_me (for `user`) in the listing query."""
+        if user is None or not user.is_authenticated:
+            return self.annotate(liked_by_me=Value(False, output_field=BooleanField()))
+        own_likes = self.model.likes.through.objects.filter(**self._like_filter(OuterRef('pk'), user))
+        return self.annotate(liked_by_me=Exists(own_likes))
+
+    def toggle_like(self, pk, user):
+        """
+        Like or unlike suggestion `pk` for `user` and return (liked, like_count).
+        The stored counter moves with F() in the same transaction as a single
+        insert/delete on the likes table, so concurrent clicks stay consistent.
+        Raises DoesNotExist for an unknown pk.
+        """
+        likes = self.model.likes.through.objects
+        suggestion = self.filter(pk=pk)
+        with transaction.atomic():
+            deleted, _ = likes.filter(**self._like_filter(pk, user)).delete()
+            if deleted:
+                suggestion.update(like_count=F('like_count') - 1)
+                liked = False
+            else:
+                # The UPDATE doubles as an existence check and locks the row.
+                if not suggestion.update(like_count=F('like_count') + 1):
+                    raise self.model.DoesNotExist
+                try:
+                    with transaction.atomic():
+                        likes.create(**self._like_filter(pk, user))
+                except IntegrityError:
+                    # A concurrent request by the same user got there first.
+                    suggestion.update(like_count=F('like_count') - 1)
+                liked = True
+            like_count = suggestion.values_list('like_count', flat=True).get()
+        return liked, like_count
+
+    def recount_likes(self):
+        """Recompute like_count from the likes table for every row in the queryset."""
+        fk = f'{self.model._meta.model_name}_id'
+        actual = (
+            self.model.likes.through.objects
+            .filter(**{fk: OuterRef('pk')})
+            .values(fk)
+            .annotate(count=Count('pk'))
+            .values('count')
+        )
+        return self.update(like_count=Coalesce(Subquery(actual, output_field=IntegerField()), Value(0)))
+
 class NewWordSuggestion(models.Model):
     term = models.CharField(max_length=100)
     definition = models.TextField()
@@ -36,14 +117,32 @@ class NewWordSuggestion(models.Model):
         ('rejected', 'Rejected')
     ], default='pending')
     likes = models.ManyToManyField(User, related_name='liked_new_word_suggestions', blank=True)
+    # Denormalized len(likes); maintained by SuggestionQuerySet.toggle_like.
+    like_count = models.PositiveIntegerField(default=0)
+    # fold(term); the unique constraint rejects duplicate proposals. NULL only
+    # for legacy duplicates that predate the constraint, which keep it NULL.
+    normalized_term = models.TextField(null=True, editable=False)
+
+    objects = SuggestionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='api_newword_status_idx'),
+            models.Index(fields=['status', '-like_count', '-id'], name='api_newword_queue_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['normalized_term'], name='api_newword_normalized_term_unique'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Filling in a legacy duplicate's key would collide with the original.
+        if self._state.adding or self.normalized_term is not None:
+            self.normalized_term = fold(self.term)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"New word suggestion: {self.term}"
 
-    @property
-    def like_count(self):
-        return self.likes.count()
-
 class SuggestionToVocabularyItem(models.Model):
     vocabulary_item = models.ForeignKey(VocabularyItem, on_delete=models.CASCADE)
     suggestion_type = models.CharField(max_length=20, choices=[('colloquial', 'Colloquial Term'), ('translation', 'Translation')])
@@ -51,10 +150,67 @@ class SuggestionToVocabularyItem(models.Model):
     language = models.CharField(max_length=2)
     status = models.CharField(max_length=20, choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected')], default='pending')
     likes = models.ManyToManyField(User, related_name='liked_vocabulary_suggestions', blank=True)
+    # Denormalized len(likes); maintained by SuggestionQuerySet.toggle_like.
+    like_count = models.PositiveIntegerField(default=0)
+    # fold(suggestion), unique per item, type and language; see NewWordSuggestion.normalized_term.
+    normalized_suggestion = models.TextField(null=True, editable=False)
+
+    objects = SuggestionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='api_vocabsugg_status_idx'),
+            models.Index(fields=['vocabulary_item', 'status'], name='api_vocabsugg_item_status_idx'),
+            models.Index(fields=['status', '-like_count', '-id'], name='api_vocabsugg_queue_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['vocabulary_item', 'suggestion_type', 'language', 'normalized_suggestion'],
+                name='api_vocabsugg_normalized_unique',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding or self.normalized_suggestion is not None:
+            self.normalized_suggestion = fold(self.suggestion)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Suggestion for {self.vocabulary_item.term}"
 
-    @property
-    def like_count(self):
-        return self.likes.count()
+class SavedVocabularyItem(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_vocabulary_items')
+    vocabulary_item = models.ForeignKey(VocabularyItem, on_delete=models.CASCADE, related_name='saved_by')
+    saved_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'vocabulary_item'], name='api_saved_user_item_unique'),
+        ]
+        indexes = [
+            # Serves the newest-first keyset pages of a user's saved list.
+            models.Index(fields=['user', '-id'], name='api_saved_user_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} saved {self.vocabulary_item_id}"
+
+class ChangeLogEntry(models.Model):
+    """One row per change relevant to offline clients; the id is the sync token."""
+    KIND_CHOICES = [
+        ('vocabulary', 'Vocabulary item'),
+        ('saved', 'Saved vocabulary item'),
+        ('reset', 'Full resync required'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    vocabulary_item_id = models.CharField(max_length=10, blank=True)
+    # Only set for 'saved' entries.
+    user = models.ForeignKey(User, null=True, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'id'], name='api_changelog_kind_idx'),
+            models.Index(fields=['user', 'id'], name='api_changelog_user_idx'),
+        ]
@@ -0,0 +1,37 @@
+"""
+Text folding shared by the search, typeahead and deduplication code.
+
+`fold` lowercases, strips diacritics and collapses whitespace so that
+"Nadciśnienie" and "nadcisnienie" compare equal.
+"""
+import re
+import unicodedata
+
+# Letters that carry no combining mark under NFKD and therefore survive
+# plain decomposition.
+_EXTRA_FOLDS = str.maketrans({
+    'ł': 'l',
+    'đ': 'd',
+    'ø': 'o',
+    'ß': 'ss',
+    'æ': 'ae',
+    'œ': 'oe',
+})
+
+_WHITESPACE = re.compile(r'\s+')
+_WORD = re.compile(r'\w+')
+
+
+def fold(text):
+    if not text:
+        return ''
+    if text.isascii():
+        # Nothing to decompose or strip; casefold() equals lower() here.
+        return _WHITESPACE.sub(' ', text.lower()).strip()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(' ', stripped.translate(_EXTRA_FOLDS)).strip()
+
+
+def tokenize(text):
+    return _WORD.findall(fold(text))
@@ -0,0 +1,66 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque to clients: the values of the ordering key of the last row
+on a page, JSON encoded and base64'd. Views decide how to turn them back into
+a `filter()` on the ordering columns.
+"""
+import base64
+import binascii
+import json
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise InvalidPageRequest('Invalid cursor')
+
+
+def get_limit(request, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    raw = request.GET.get('limit')
+    if raw is None:
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise InvalidPageRequest('limit must be an integer')
+    if limit < 1:
+        raise InvalidPageRequest('limit must be positive')
+    return min(limit, maximum)
+
+
+def get_cursor(request, size=1):
+    cursor = request.GET.get('cursor')
+    if not cursor:
+        return None
+    values = decode_cursor(cursor)
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidPageRequest('Invalid cursor')
+    return values
+
+
+def paginate(queryset, limit, cursor_values):
+    """
+    Evaluate one page of an already keyset-filtered and ordered queryset.
+    `cursor_values(obj)` returns the ordering key to resume after `obj`.
+    """
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(cursor_values(rows[-1]))
+    return rows, next_cursor
@@ -0,0 +1,262 @@
+"""
+Per-request SQL, serialization and rendering timings.
+
+When REQUEST_METRICS['ENABLED'] is set, RequestMetricsMiddleware times
+every request:
+- db: query count and time, through `connection.execute_wrapper`;
+- serialize: time spent in top-level DRF `serializer.data`, including the
+  queries it triggers;
+- render: the time between the view returning a DRF/template response and
+  the end of its rendering;
+- total, plus the response size.
+
+The numbers are sent back as a `Server-Timing` header and aggregated per
+route in this process (see `store`, served by the `request-stats/`
+endpoint). A query shape (SQL with IN lists collapsed) that runs at least
+N_PLUS_ONE_THRESHOLD times in one request is logged as a likely N+1.
+Queries made while a streaming response is consumed are not counted.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SERVER_TIMING': True,
+    'N_PLUS_ONE_THRESHOLD': 10,
+    'SAMPLE_SIZE': 500,
+}
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_current = threading.local()
+
+
+def get_setting(name):
+    return getattr(settings, 'REQUEST_METRICS', {}).get(name, DEFAULTS[name])
+
+
+def percentile(sorted_values, p):
+    # Nearest-rank percentile.
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def query_shape(sql):
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """An execute_wrapper that counts and times queries by shape."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.shapes[query_shape(sql)] += 1
+
+    def repeated(self, threshold):
+        """The most repeated query shape as (sql, count), if it reached `threshold`."""
+        if not self.shapes:
+            return None
+        sql, count = self.shapes.most_common(1)[0]
+        return (sql, count) if count >= threshold else None
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = QueryRecorder()
+        self.serialize = 0.0
+        self.serialize_queries = 0
+        self.serializing = False
+        self.render_started = None
+        self.render = 0.0
+        self.total = 0.0
+
+    def server_timing(self):
+        def ms(seconds):
+            return f'{seconds * 1000:.1f}'
+        return ', '.join([
+            f'db;dur={ms(self.queries.duration)};desc="{self.queries.count} queries"',
+            f'serialize;dur={ms(self.serialize)};desc="{self.serialize_queries} queries"',
+            f'render;dur={ms(self.render)}',
+            f'total;dur={ms(self.total)}',
+        ])
+
+
+def current_timings():
+    return getattr(_current, 'timings', None)
+
+
+def _timed_data(data_property):
+    def data(self):
+        timings = current_timings()
+        # Only the outermost serializer is timed; nested ones are part of it.
+        if timings is None or timings.serializing:
+            return data_property.fget(self)
+        timings.serializing = True
+        start = time.perf_counter()
+        queries_before = timings.queries.count
+        try:
+            return data_property.fget(self)
+        finally:
+            timings.serializing = False
+            timings.serialize += time.perf_counter() - start
+            timings.serialize_queries += timings.queries.count - queries_before
+    return property(data)
+
+
+_serializers_patched = False
+
+
+def install_serializer_timing():
+    global _serializers_patched
+    if _serializers_patched:
+        return
+    from rest_framework import serializers
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        cls.data = _timed_data(cls.data)
+    _serializers_patched = True
+
+
+class RouteStats:
+    def __init__(self, sample_size):
+        self.count = 0
+        self.errors = 0
+        self.durations = deque(maxlen=sample_size)
+        self.total = 0.0
+        self.db = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.serialize = 0.0
+        self.render = 0.0
+        self.bytes = 0
+        self.n_plus_one = 0
+        self.last_n_plus_one = None
+
+    def add(self, timings, status_code, size, repeated):
+        self.count += 1
+        self.errors += status_code >= 500
+        self.durations.append(timings.total)
+        self.total += timings.total
+        self.db += timings.queries.duration
+        self.queries += timings.queries.count
+        self.max_queries = max(self.max_queries, timings.queries.count)
+        self.serialize += timings.serialize
+        self.render += timings.render
+        self.bytes += size or 0
+        if repeated:
+            self.n_plus_one += 1
+            self.last_n_plus_one = {'sql': repeated[0][:500], 'count': repeated[1]}
+
+    def summary(self):
+        durations = sorted(self.durations)
+
+        def mean_ms(total):
+            return round(total / self.count * 1000, 2)
+        return {
+            'requests': self.count,
+            'server_errors': self.errors,
+            'p50_ms': round(percentile(durations, 50) * 1000, 2),
+            'p95_ms': round(percentile(durations, 95) * 1000, 2),
+            'p99_ms': round(percentile(durations, 99) * 1000, 2),
+            'mean_ms': mean_ms(self.total),
+            'mean_db_ms': mean_ms(self.db),
+            'mean_serialize_ms': mean_ms(self.serialize),
+            'mean_render_ms': mean_ms(self.render),
+            'mean_queries': round(self.queries / self.count, 2),
+            'max_queries': self.max_queries,
+            'mean_response_bytes': round(self.bytes / self.count),
+            'n_plus_one_requests': self.n_plus_one,
+            'last_n_plus_one': self.last_n_plus_one,
+        }
+
+
+class MetricsStore:
+    """Per-route aggregates for this process; percentiles use the last SAMPLE_SIZE requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+            self.since = datetime.now(timezone.utc)
+
+    def record(self, route, timings, status_code, size, repeated):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats(get_setting('SAMPLE_SIZE'))
+            stats.add(timings, status_code, size, repeated)
+
+    def snapshot(self):
+        with self._lock:
+            return {route: stats.summary() for route, stats in sorted(self._routes.items())}
+
+
+store = MetricsStore()
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return f"{request.method} /{match.route}" if match is not None else f'{request.method} <unresolved>'
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        if not get_setting('ENABLED'):
+            raise MiddlewareNotUsed
+        install_serializer_timing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = _current.timings = RequestTimings()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings.queries))
+                response = self.get_response(request)
+        finally:
+            _current.timings = None
+        timings.total = time.perf_counter() - timings.started
+
+        route = route_name(request)
+        repeated = timings.queries.repeated(get_setting('N_PLUS_ONE_THRESHOLD'))
+        if repeated:
+            logger.warning('Possible N+1 in %s: %d x %s', route, repeated[1], repeated[0][:500])
+        size = None if response.streaming else len(response.content)
+        store.record(route, timings, response.status_code, size, repeated)
+        if get_setting('SERVER_TIMING'):
+            response['Server-Timing'] = timings.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook returns.
+        timings = current_timings()
+        if timings is not None:
+            timings.render_started = time.perf_counter()
+
+            def rendered(response):
+                timings.render = time.perf_counter() - timings.render_started
+            response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,234 @@
+"""
+Indexed vocabulary search.
+
+Each vocabulary item is stored in the `api_vocabulary_search` table as one
+document with three columns (term, translations, definition), all folded with
+`normalization.fold`. SQLite uses an FTS5 virtual table, PostgreSQL a
+tsvector column plus a trigram index; any other database falls back to
+`icontains` lookups on the ORM. The table is created by migration
+0011_vocabulary_search_index and kept in sync by api/signals.py.
+
+Backends only return candidate ids, already restricted to items with a
+translation in the requested language so that LIMIT counts usable rows;
+`search_vocabulary` ranks them so that exact matches come first, then prefix
+matches, then everything else in the backend's relevance order.
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import VocabularyItem, Translation
+from .normalization import fold, tokenize
+
+SEARCH_TABLE = 'api_vocabulary_search'
+DEFAULT_LIMIT = 50
+INSERT_BATCH_SIZE = 500
+
+
+def build_documents(item_ids=None):
+    """Yield (item_id, term, translations, definition) rows, folded for indexing."""
+    items = VocabularyItem.objects.order_by('pk').values_list('pk', 'term', 'definition')
+    if item_ids is not None:
+        items = items.filter(pk__in=item_ids)
+    chunk = []
+    for row in items.iterator(chunk_size=INSERT_BATCH_SIZE):
+        chunk.append(row)
+        if len(chunk) >= INSERT_BATCH_SIZE:
+            yield from _chunk_documents(chunk)
+            chunk = []
+    if chunk:
+        yield from _chunk_documents(chunk)
+
+
+def _chunk_documents(rows):
+    translations = {}
+    queryset = Translation.objects.filter(vocabulary_item_id__in=[row[0] for row in rows]).order_by('pk')
+    for item_id, text in queryset.values_list('vocabulary_item_id', 'translation'):
+        translations.setdefault(item_id, []).append(text)
+    for item_id, term, definition in rows:
+        yield item_id, fold(term), fold(' '.join(translations.get(item_id, ()))), fold(definition)
+
+
+class SearchBackend:
+    def index_items(self, item_ids):
+        """Re-index the given items; ids that no longer exist are dropped."""
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def candidate_ids(self, query, limit, language=''):
+        raise NotImplementedError
+
+
+# Correlated filter for the table backends: the item has a translation in %s.
+LANGUAGE_FILTER = (
+    f' AND EXISTS (SELECT 1 FROM api_translation WHERE api_translation.vocabulary_item_id = '
+    f'{SEARCH_TABLE}.item_id AND api_translation.language = %s)'
+)
+
+
+class TableSearchBackend(SearchBackend):
+    # The table that holds one row per item, keyed by an indexed item_id.
+    content_table = SEARCH_TABLE
+    insert_sql = None
+
+    def index_items(self, item_ids):
+        item_ids = list(item_ids)
+        if not item_ids:
+            return
+        with connection.cursor() as cursor:
+            for start in range(0, len(item_ids), INSERT_BATCH_SIZE):
+                batch = item_ids[start:start + INSERT_BATCH_SIZE]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(f'DELETE FROM {self.content_table} WHERE item_id IN ({placeholders})', batch)
+            self._insert(cursor, build_documents(item_ids))
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.content_table}')
+            self._insert(cursor, build_documents())
+
+    def _insert(self, cursor, documents):
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= INSERT_BATCH_SIZE:
+                cursor.executemany(self.insert_sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(self.insert_sql, batch)
+
+
+class SqliteFtsBackend(TableSearchBackend):
+    # The FTS5 table is an external-content index over this table; triggers
+    # keep it in step, so deletes go through the unique item_id index.
+    content_table = f'{SEARCH_TABLE}_rows'
+    insert_sql = (
+        f'INSERT INTO {content_table} (item_id, term, translations, definition) '
+        'VALUES (%s, %s, %s, %s)'
+    )
+
+    def candidate_ids(self, query, limit, language=''):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        where, params = f'{SEARCH_TABLE} MATCH %s', [match]
+        if language:
+            where += LANGUAGE_FILTER
+            params.append(language)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT item_id FROM {SEARCH_TABLE} WHERE {where} '
+                f'ORDER BY bm25({SEARCH_TABLE}, 0, 10.0, 5.0, 1.0) LIMIT %s',
+                params + [limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def escape_like(text):
+    """Escape LIKE wildcards so the query is matched literally."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class PostgresSearchBackend(TableSearchBackend):
+    insert_sql = (
+        f'INSERT INTO {SEARCH_TABLE} (item_id, term, translations, definition, document) '
+        'VALUES (%s, %s, %s, %s, '
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'C'))"
+    )
+
+    def _insert(self, cursor, documents):
+        super()._insert(cursor, (row + row[1:] for row in documents))
+
+    def candidate_ids(self, query, limit, language=''):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        folded = fold(query)
+        where = "(document @@ to_tsquery('simple', %s) OR (term || ' ' || translations) ILIKE %s)"
+        params = [tsquery, f'%{escape_like(folded)}%']
+        if language:
+            where += LANGUAGE_FILTER
+            params.append(language)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT item_id FROM {SEARCH_TABLE} WHERE {where} '
+                "ORDER BY ts_rank(document, to_tsquery('simple', %s)) DESC, "
+                'similarity(term, %s) DESC LIMIT %s',
+                params + [tsquery, folded, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class OrmSearchBackend(SearchBackend):
+    """Unindexed fallback for databases without a dedicated backend."""
+
+    def index_items(self, item_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def candidate_ids(self, query, limit, language=''):
+        items = VocabularyItem.objects.filter(
+            Q(term__icontains=query) |
+            Q(translations__translation__icontains=query)
+        )
+        if language:
+            items = items.filter(pk__in=Translation.objects.filter(language=language).values('vocabulary_item_id'))
+        return list(items.distinct().values_list('pk', flat=True)[:limit])
+
+
+BACKENDS = {
+    'sqlite': SqliteFtsBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend():
+    name = getattr(settings, 'VOCABULARY_SEARCH_BACKEND', None) or connection.vendor
+    return BACKENDS.get(name, OrmSearchBackend)()
+
+
+def _match_rank(item, folded_query, language):
+    texts = [t.translation for t in item.translations.all() if not language or t.language == language]
+    texts.append(item.term)
+    folded_texts = [fold(text) for text in texts]
+    if folded_query in folded_texts:
+        return 0
+    if any(text.startswith(folded_query) for text in folded_texts):
+        return 1
+    return 2
+
+
+def filter_by_language(item_ids, language):
+    """Keep, in order, the ids of items that have a translation in `language`."""
+    having = set(
+        Translation.objects.filter(vocabulary_item_id__in=item_ids, language=language)
+        .values_list('vocabulary_item_id', flat=True)
+    )
+    return [item_id for item_id in item_ids if item_id in having]
+
+
+def load_items(candidate_ids):
+    """Fetch candidate items (translations prefetched) in candidate order."""
+    items = VocabularyItem.objects.filter(pk__in=candidate_ids).prefetch_related('translations')
+    position = {item_id: index for index, item_id in enumerate(candidate_ids)}
+    return sorted(items, key=lambda item: position[item.pk])
+
+
+def search_vocabulary(query, language='', limit=DEFAULT_LIMIT):
+    """Return matching VocabularyItems (translations prefetched), best match first."""
+    candidate_ids = get_backend().candidate_ids(query, limit, language)
+    if not candidate_ids:
+        return []
+
+    items = load_items(candidate_ids)
+    folded_query = fold(query)
+    # sorted() is stable, so the backend's relevance order breaks ties.
+    return sorted(items, key=lambda item: _match_rank(item, folded_query, language))
@@ -1,7 +1,6 @@
 from rest_framework import serializers
+from .item_ids import new_item_id
 from .models import VocabularyItem, Translation, NewWordSuggestion, SuggestionToVocabularyItem
-import uuid
-from itertools import groupby
 
 class TranslationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,42 +16,76 @@ class VocabularyItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = VocabularyItem
         fields = ['id', 'term', 'definition', 'category', 'translations', 'primary_translations', 'colloquial_terms', 'user_proposed_translations']
+        # Minted from the term and category in create() when omitted.
+        extra_kwargs = {'id': {'required': False}}
+
+    TRANSLATION_FIELDS = {'translations', 'primary_translations', 'colloquial_terms', 'user_proposed_translations'}
+
+    def __init__(self, *args, **kwargs):
+        # Optional projection: `fields` restricts the output to a subset of Meta.fields.
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    def _translation_buckets(self, obj):
+        # Partition obj.translations.all() once so the prefetch cache is reused
+        # by every derived field instead of issuing a filter() query per field.
+        buckets = getattr(obj, '_translation_buckets', None)
+        if buckets is None:
+            buckets = {'primary': {}, 'colloquial': {}, 'user_proposed': {}}
+            for t in obj.translations.all():
+                if t.is_primary:
+                    buckets['primary'][t.language] = t.translation
+                if t.is_colloquial:
+                    buckets['colloquial'].setdefault(t.language, []).append(t.translation)
+                if t.is_user_proposed:
+                    buckets['user_proposed'].setdefault(t.language, []).append(t.translation)
+            obj._translation_buckets = buckets
+        return buckets
 
     def get_primary_translations(self, obj):
-        return {t.language: t.translation for t in obj.translations.filter(is_primary=True)}
+        return self._translation_buckets(obj)['primary']
 
     def get_colloquial_terms(self, obj):
-        colloquial_translations = obj.translations.filter(is_colloquial=True)
-        return {
-            language: [t.translation for t in language_translations]
-            for language, language_translations in groupby(colloquial_translations, key=lambda x: x.language)
-        }
+        return self._translation_buckets(obj)['colloquial']
 
     def get_user_proposed_translations(self, obj):
-        user_proposed_translations = obj.translations.filter(is_user_proposed=True)
-        return {
-            language: [t.translation for t in language_translations]
-            for language, language_translations in groupby(user_proposed_translations, key=lambda x: x.language)
-        }
+        return self._translation_buckets(obj)['user_proposed']
 
     def create(self, validated_data):
         if 'id' not in validated_data:
-            validated_data['id'] = str(uuid.uuid4())[:10]
+            validated_data['id'] = new_item_id(validated_data.get('term', ''), validated_data.get('category', ''))
         return super().create(validated_data)
     
-class NewWordSuggestionSerializer(serializers.ModelSerializer):
+class LikedByMeMixin:
+    def get_liked_by_me(self, obj):
+        # Only present when the queryset went through with_like_info().
+        return getattr(obj, 'liked_by_me', False)
+
+class NewWordSuggestionSerializer(LikedByMeMixin, serializers.ModelSerializer):
     like_count = serializers.IntegerField(read_only=True)
+    liked_by_me = serializers.SerializerMethodField()
 
     class Meta:
         model = NewWordSuggestion
-        fields = ['id', 'term', 'definition', 'translation', 'language', 'category', 'status', 'like_count']
+        fields = ['id', 'term', 'definition', 'translation', 'language', 'category', 'status', 'like_count', 'liked_by_me']
         read_only_fields = ['status', 'like_count']
 
-class SuggestionToVocabularyItemSerializer(serializers.ModelSerializer):
+class SuggestionToVocabularyItemSerializer(LikedByMeMixin, serializers.ModelSerializer):
     vocabulary_item = serializers.PrimaryKeyRelatedField(queryset=VocabularyItem.objects.all())
     like_count = serializers.IntegerField(read_only=True)
+    liked_by_me = serializers.SerializerMethodField()
 
     class Meta:
         model = SuggestionToVocabularyItem
-        fields = ['id', 'vocabulary_item', 'suggestion_type', 'suggestion', 'language', 'status', 'like_count']
+        fields = ['id', 'vocabulary_item', 'suggestion_type', 'suggestion', 'language', 'status', 'like_count', 'liked_by_me']
         read_only_fields = ['status', 'like_count']
+
+class ModerationVocabularySuggestionSerializer(SuggestionToVocabularyItemSerializer):
+    # Reviewers need the term; the queue select_related()s vocabulary_item.
+    term = serializers.CharField(source='vocabulary_item.term', read_only=True)
+
+    class Meta(SuggestionToVocabularyItemSerializer.Meta):
+        fields = SuggestionToVocabularyItemSerializer.Meta.fields + ['term']
@@ -0,0 +1,97 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from . import changelog, search, vocabulary_cache
+from .fuzzy import fuzzy_index
+from .similarity import bump_suggestion_version, suggestion_similarity_index, vocabulary_similarity_index
+from .typeahead import prefix_index
+from .models import VocabularyItem, Translation, NewWordSuggestion, SuggestionToVocabularyItem
+
+IN_MEMORY_INDEXES = [prefix_index, fuzzy_index, vocabulary_similarity_index]
+
+_bulk_write = threading.local()
+
+
+@contextmanager
+def bulk_vocabulary_write():
+    """
+    Mute the per-row vocabulary receivers below for this thread, e.g. while
+    an import deletes or inserts thousands of rows. The caller reports the
+    result with a single `vocabulary_changed` call afterwards. Nested uses
+    keep the receivers muted until the outermost one exits.
+    """
+    previous = getattr(_bulk_write, 'active', False)
+    _bulk_write.active = True
+    try:
+        yield
+    finally:
+        _bulk_write.active = previous
+
+
+def vocabulary_changed(item_ids=None):
+    """
+    Invalidate everything derived from the vocabulary. `item_ids` lists the
+    touched items; None means the whole dictionary may have changed. Bulk
+    writes (bulk_create, update()) bypass the model signals below and must
+    call this directly.
+    """
+    # Bump now so readers inside this transaction never cache under the old
+    # version, and again on commit so anything rendered from uncommitted
+    # state in the meantime is superseded.
+    vocabulary_cache.bump_version()
+    transaction.on_commit(vocabulary_cache.bump_version)
+    changelog.log_vocabulary_changes(item_ids)
+
+    backend = search.get_backend()
+    if item_ids is None:
+        backend.rebuild()
+        for index in IN_MEMORY_INDEXES:
+            transaction.on_commit(index.invalidate)
+    else:
+        backend.index_items(item_ids)
+        item_ids = list(item_ids)
+        for index in IN_MEMORY_INDEXES:
+            index.schedule_refresh(item_ids)
+
+
+def new_word_suggestions_changed(suggestion_ids):
+    """
+    Refresh the duplicate index for the given new-word suggestions. Like
+    `vocabulary_changed`, bulk writes must call this themselves.
+    """
+    transaction.on_commit(bump_suggestion_version)
+    suggestion_similarity_index.schedule_refresh(suggestion_ids)
+
+
+@receiver([post_save, post_delete], sender=VocabularyItem)
+def vocabulary_item_changed(sender, instance, **kwargs):
+    if not getattr(_bulk_write, 'active', False):
+        vocabulary_changed([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Translation)
+def translation_changed(sender, instance, **kwargs):
+    if not getattr(_bulk_write, 'active', False):
+        vocabulary_changed([instance.vocabulary_item_id])
+
+
+@receiver([post_save, post_delete], sender=NewWordSuggestion)
+def new_word_suggestion_changed(sender, instance, **kwargs):
+    new_word_suggestions_changed([instance.pk])
+
+
+@receiver(m2m_changed, sender=NewWordSuggestion.likes.through)
+@receiver(m2m_changed, sender=SuggestionToVocabularyItem.likes.through)
+def likes_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    # Writes through the related manager (admin, shell) bypass toggle_like,
+    # so resync the stored counters of the affected suggestions.
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        type(instance).objects.filter(pk=instance.pk).recount_likes()
+    elif pk_set:
+        model.objects.filter(pk__in=pk_set).recount_likes()
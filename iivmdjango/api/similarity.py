@@ -0,0 +1,142 @@
+"""
+Near-duplicate detection for vocabulary terms and new-word suggestions.
+
+Terms are reduced to their folded words (so punctuation and hyphens do not
+matter) and indexed by character trigrams. Candidates sharing trigrams with
+the query are scored with the Dice coefficient, which puts "Heart attack",
+"Heart-attack" and "heart attacks" well above THRESHOLD.
+
+Two indexes are kept: one over vocabulary terms, refreshed by
+`api.signals.vocabulary_changed` like the typeahead, and one over pending
+new-word suggestions with its own shared version, refreshed by
+`api.signals.new_word_suggestions_changed`.
+"""
+import time
+from collections import Counter
+
+from . import vocabulary_cache
+from .lexicon_index import LexiconEntry, LexiconIndex, writable
+from .models import NewWordSuggestion
+from .normalization import tokenize
+
+THRESHOLD = 0.6
+DEFAULT_LIMIT = 5
+
+SUGGESTION_VERSION_KEY = 'suggestions:version'
+
+
+def similarity_key(text):
+    return ' '.join(tokenize(text))
+
+
+def trigrams(text):
+    padded = f'  {similarity_key(text)} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramState:
+    def __init__(self):
+        self.grams_by_key = {}
+        self.keys_by_gram = {}
+        self.texts = {}
+
+    def add(self, key, text):
+        self.remove(key)
+        grams = trigrams(text)
+        self.grams_by_key[key] = grams
+        self.texts[key] = text
+        for gram in grams:
+            writable(self, self.keys_by_gram, gram).add(key)
+
+    def remove(self, key):
+        self.texts.pop(key, None)
+        for gram in self.grams_by_key.pop(key, ()):
+            keys = writable(self, self.keys_by_gram, gram)
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_gram[gram]
+
+    def similar(self, text, threshold=THRESHOLD, limit=DEFAULT_LIMIT, exclude=()):
+        """Return [(key, score)] with Dice similarity >= threshold, best first."""
+        grams = trigrams(text)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.keys_by_gram.get(gram, ()))
+        scored = []
+        for key, count in shared.items():
+            if key in exclude:
+                continue
+            score = 2 * count / (len(grams) + len(self.grams_by_key[key]))
+            if score >= threshold:
+                scored.append((key, round(score, 3)))
+        scored.sort(key=lambda pair: (-pair[1], str(pair[0])))
+        return scored[:limit]
+
+
+class SimilarityIndex(LexiconIndex):
+    def empty_state(self):
+        return TrigramState()
+
+    def copy_state(self, state):
+        copy = TrigramState()
+        copy.grams_by_key = dict(state.grams_by_key)
+        copy.keys_by_gram = dict(state.keys_by_gram)
+        copy.texts = dict(state.texts)
+        return copy
+
+    def remove_item(self, state, item_id):
+        state.remove(item_id)
+
+    def similar(self, text, limit=DEFAULT_LIMIT, exclude=()):
+        state = self.current_state()
+        return [
+            {'id': key, 'term': state.texts[key], 'score': score}
+            for key, score in state.similar(text, limit=limit, exclude=exclude)
+        ]
+
+
+class VocabularySimilarityIndex(SimilarityIndex):
+    def add_entry(self, state, entry):
+        if entry.kind == 'term':
+            state.add(entry.item_id, entry.text)
+
+
+class SuggestionSimilarityIndex(SimilarityIndex):
+    def add_entry(self, state, entry):
+        state.add(entry.item_id, entry.text)
+
+    def iter_entries(self, item_ids=None):
+        suggestions = NewWordSuggestion.objects.filter(status='pending')
+        if item_ids is not None:
+            suggestions = suggestions.filter(pk__in=item_ids)
+        for pk, term, language in suggestions.values_list('pk', 'term', 'language').iterator():
+            yield LexiconEntry(pk, term, language, 'suggestion')
+
+    def shared_version(self):
+        cache = vocabulary_cache.shared_cache()
+        version = cache.get(SUGGESTION_VERSION_KEY)
+        if version is None:
+            cache.add(SUGGESTION_VERSION_KEY, int(time.time() * 1000000), timeout=None)
+            version = cache.get(SUGGESTION_VERSION_KEY)
+        return version
+
+
+def bump_suggestion_version():
+    cache = vocabulary_cache.shared_cache()
+    try:
+        cache.incr(SUGGESTION_VERSION_KEY)
+    except ValueError:
+        cache.add(SUGGESTION_VERSION_KEY, int(time.time() * 1000000), timeout=None)
+
+
+vocabulary_similarity_index = VocabularySimilarityIndex()
+suggestion_similarity_index = SuggestionSimilarityIndex()
+
+
+def find_possible_duplicates(term, exclude_suggestion=None, limit=DEFAULT_LIMIT):
+    """Vocabulary items and pending new-word suggestions that look like `term`."""
+    exclude = () if exclude_suggestion is None else (exclude_suggestion,)
+    return {
+        'vocabulary': vocabulary_similarity_index.similar(term, limit=limit),
+        'suggestions': suggestion_similarity_index.similar(term, limit=limit, exclude=exclude),
+    }
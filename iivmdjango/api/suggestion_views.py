@@ -2,10 +2,14 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.db import transaction
-from .serializers import VocabularyItemSerializer, NewWordSuggestionSerializer, SuggestionToVocabularyItemSerializer
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from .serializers import VocabularyItemSerializer, NewWordSuggestionSerializer, SuggestionToVocabularyItemSerializer, ModerationVocabularySuggestionSerializer
+from .item_ids import assign_item_ids, new_item_id
+from .pagination import InvalidPageRequest, get_cursor, get_limit, paginate
+from .signals import bulk_vocabulary_write, new_word_suggestions_changed, vocabulary_changed
+from .similarity import find_possible_duplicates
 from .models import VocabularyItem, Translation, NewWordSuggestion, SuggestionToVocabularyItem
-import uuid
 import logging
 
 
@@ -14,10 +18,12 @@ logger = logging.getLogger(__name__)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_new_word_suggestion(request):
-    term = request.data.get('term', '').lower()  # Convert to lowercase
+    submitted = request.data.get('term', '')
+    term = submitted.lower()  # Convert to lowercase
 
-    # Check if the word already exists in the VocabularyItem model (case-insensitive)
-    if VocabularyItem.objects.filter(term__iexact=term).exists():
+    # Check if the word already exists in the VocabularyItem model (case-insensitive).
+    # SQLite's LOWER() only folds ASCII, so the term is also checked as sent.
+    if VocabularyItem.objects.matching_terms({submitted, term}).exists():
         return Response({
             'error': 'Validation failed',
             'details': {
@@ -25,23 +31,27 @@ def create_new_word_suggestion(request):
             }
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    # Check if the suggestion already exists (case-insensitive)
-    if NewWordSuggestion.objects.filter(term__iexact=term).exists():
-        return Response({
-            'error': 'Validation failed',
-            'details': {
-                'term': ['A suggestion for this word already exists.']
-            }
-        }, status=status.HTTP_400_BAD_REQUEST)
-
     # Create a new dictionary with lowercase 'term'
     lowercase_data = request.data.copy()
     lowercase_data['term'] = term
 
     serializer = NewWordSuggestionSerializer(data=lowercase_data)
     if serializer.is_valid():
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        # Duplicate proposals are rejected by the unique normalized_term
+        # constraint rather than by a racy lookup beforehand.
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            return Response({
+                'error': 'Validation failed',
+                'details': {
+                    'term': ['A suggestion for this word already exists.']
+                }
+            }, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.data
+        data['possible_duplicates'] = find_possible_duplicates(term, exclude_suggestion=serializer.instance.pk)
+        return Response(data, status=status.HTTP_201_CREATED)
 
     # If the serializer is not valid, return detailed error messages
     return Response({
@@ -80,23 +90,6 @@ def create_suggestion_for_the_word(request):
         
         logger.info(f"Received suggestion: type={suggestion_type}, suggestion={suggestion}, language={language}")
 
-        # Check if a similar suggestion already exists
-        existing_suggestion = SuggestionToVocabularyItem.objects.filter(
-            vocabulary_item=vocabulary_item,
-            suggestion_type='colloquial' if suggestion_type == 'colloquial' else 'translation',
-            suggestion=suggestion,
-            language=language
-        ).first()
-
-        if existing_suggestion:
-            logger.warning(f"Similar suggestion already exists: {existing_suggestion}")
-            return Response({
-                'error': 'Validation failed',
-                'details': {
-                    'suggestion': ['A similar suggestion already exists for this term']
-                }
-            }, status=status.HTTP_409_CONFLICT)
-
         serializer_data = {
             'vocabulary_item': vocabulary_item.id,
             'suggestion_type': 'colloquial' if suggestion_type == 'colloquial' else 'translation',
@@ -107,7 +100,17 @@ def create_suggestion_for_the_word(request):
         
         serializer = SuggestionToVocabularyItemSerializer(data=serializer_data)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                with transaction.atomic():
+                    serializer.save()
+            except IntegrityError:
+                logger.warning(f"Similar suggestion already exists for '{term}'")
+                return Response({
+                    'error': 'Validation failed',
+                    'details': {
+                        'suggestion': ['A similar suggestion already exists for this term']
+                    }
+                }, status=status.HTTP_409_CONFLICT)
             logger.info(f"Suggestion created successfully: {serializer.data}")
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         else:
@@ -130,24 +133,34 @@ def create_suggestion_for_the_word(request):
 @permission_classes([IsAuthenticated])
 def approve_new_word_suggestion(request, pk):
     try:
-        with transaction.atomic():
+        with transaction.atomic(), bulk_vocabulary_write():
             suggestion = NewWordSuggestion.objects.get(pk=pk)
-            
-            vocabulary_item_id = str(uuid.uuid4())[:10]  # Generate a unique ID
-            
-            vocabulary_item = VocabularyItem.objects.create(
-                id=vocabulary_item_id,  # Assign the unique ID
-                term=suggestion.term,
-                definition=suggestion.definition,
-                category=suggestion.category
-            )
-            
+
+            # The term may have been added to the vocabulary since the
+            # suggestion was filed; the LOWER(term) unique index catches it.
+            try:
+                with transaction.atomic():
+                    vocabulary_item = VocabularyItem.objects.create(
+                        id=new_item_id(suggestion.term, suggestion.category),
+                        term=suggestion.term,
+                        definition=suggestion.definition,
+                        category=suggestion.category
+                    )
+            except IntegrityError:
+                return Response({
+                    'error': 'Validation failed',
+                    'details': {
+                        'term': ['This word already exists in the vocabulary.']
+                    }
+                }, status=status.HTTP_409_CONFLICT)
+
             Translation.objects.create(
                 vocabulary_item=vocabulary_item,
                 language=suggestion.language,
                 translation=suggestion.translation,
                 is_primary=True
             )
+            vocabulary_changed([vocabulary_item.pk])
             
             suggestion.status = 'accepted'
             suggestion.save()
@@ -167,12 +180,15 @@ def approve_vocabulary_suggestion(request, pk):
             suggestion = SuggestionToVocabularyItem.objects.get(pk=pk)
             vocabulary_item = suggestion.vocabulary_item
             
-            Translation.objects.create(
+            # A legacy duplicate of an accepted suggestion may already be there.
+            Translation.objects.get_or_create(
                 vocabulary_item=vocabulary_item,
                 language=suggestion.language,
                 translation=suggestion.suggestion,
-                is_colloquial=(suggestion.suggestion_type == 'colloquial'),
-                is_user_proposed=(suggestion.suggestion_type == 'translation')
+                defaults={
+                    'is_colloquial': suggestion.suggestion_type == 'colloquial',
+                    'is_user_proposed': suggestion.suggestion_type == 'translation',
+                }
             )
             
             suggestion.status = 'accepted'
@@ -209,10 +225,141 @@ def reject_suggestion(request, pk):
     except model.DoesNotExist:
         return Response({'error': 'Suggestion not found'}, status=status.HTTP_404_NOT_FOUND)
 
+MAX_BULK_IDS = 500
+
+def get_bulk_request(request):
+    """Validate {'suggestion_type': ..., 'ids': [...]} and return (model, ids, error_response)."""
+    suggestion_type = request.data.get('suggestion_type')
+    if suggestion_type == 'new_word':
+        model = NewWordSuggestion
+    elif suggestion_type == 'vocabulary':
+        model = SuggestionToVocabularyItem
+    else:
+        return None, None, Response({'error': 'Invalid suggestion type'}, status=status.HTTP_400_BAD_REQUEST)
+
+    ids = request.data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+        return None, None, Response({
+            'error': 'Validation failed',
+            'details': {'ids': ['A non-empty list of suggestion ids is required.']}
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > MAX_BULK_IDS:
+        return None, None, Response({
+            'error': 'Validation failed',
+            'details': {'ids': [f'At most {MAX_BULK_IDS} ids can be processed at once.']}
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return model, list(dict.fromkeys(ids)), None
+
+def lock_pending_suggestions(model, ids, results):
+    """Lock the requested rows, record non-pending/missing ids in `results` and return the pending ones."""
+    pending = []
+    for suggestion in model.objects.select_for_update().filter(pk__in=ids):
+        if suggestion.status == 'pending':
+            pending.append(suggestion)
+        else:
+            results[suggestion.pk] = f'already_{suggestion.status}'
+    found = {suggestion.pk for suggestion in pending} | set(results)
+    for pk in ids:
+        if pk not in found:
+            results[pk] = 'not_found'
+    return pending
+
+def bulk_approve_vocabulary_suggestions(suggestions, results):
+    Translation.objects.bulk_create([
+        Translation(
+            vocabulary_item_id=suggestion.vocabulary_item_id,
+            language=suggestion.language,
+            translation=suggestion.suggestion,
+            is_colloquial=(suggestion.suggestion_type == 'colloquial'),
+            is_user_proposed=(suggestion.suggestion_type == 'translation')
+        )
+        for suggestion in suggestions
+    ], ignore_conflicts=True)
+    for suggestion in suggestions:
+        results[suggestion.pk] = 'accepted'
+    return {suggestion.vocabulary_item_id for suggestion in suggestions}
+
+def bulk_approve_new_word_suggestions(suggestions, results):
+    # str.lower() folds at least as much as the database's LOWER(), so it
+    # catches every suggestion the unique index would reject, including
+    # conflicts between suggestions in this batch.
+    existing_terms = VocabularyItem.objects.matching_terms([s.term for s in suggestions]).values_list('term', flat=True)
+    taken = {term.lower() for term in existing_terms}
+    accepted = []
+    for suggestion in suggestions:
+        if suggestion.term.lower() in taken:
+            results[suggestion.pk] = 'conflict'
+            continue
+        taken.add(suggestion.term.lower())
+        accepted.append(suggestion)
+        results[suggestion.pk] = 'accepted'
+
+    item_ids = assign_item_ids([(suggestion.term, suggestion.category) for suggestion in accepted])
+    items, translations = [], []
+    for suggestion, item_id in zip(accepted, item_ids):
+        item = VocabularyItem(
+            id=item_id,
+            term=suggestion.term,
+            definition=suggestion.definition,
+            category=suggestion.category
+        )
+        items.append(item)
+        translations.append(Translation(
+            vocabulary_item=item,
+            language=suggestion.language,
+            translation=suggestion.translation,
+            is_primary=True
+        ))
+    VocabularyItem.objects.bulk_create(items)
+    Translation.objects.bulk_create(translations)
+    return {item.pk for item in items}
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_approve_suggestions(request):
+    model, ids, error = get_bulk_request(request)
+    if error:
+        return error
+
+    results = {}
+    with transaction.atomic():
+        pending = lock_pending_suggestions(model, ids, results)
+        if model is NewWordSuggestion:
+            item_ids = bulk_approve_new_word_suggestions(pending, results)
+        else:
+            item_ids = bulk_approve_vocabulary_suggestions(pending, results)
+        accepted = [pk for pk, result in results.items() if result == 'accepted']
+        model.objects.filter(pk__in=accepted).update(status='accepted')
+        if item_ids:
+            vocabulary_changed(item_ids)
+        if model is NewWordSuggestion and accepted:
+            new_word_suggestions_changed(accepted)
+
+    return Response({'results': {str(pk): results[pk] for pk in ids}}, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_reject_suggestions(request):
+    model, ids, error = get_bulk_request(request)
+    if error:
+        return error
+
+    results = {}
+    with transaction.atomic():
+        pending = lock_pending_suggestions(model, ids, results)
+        rejected = [suggestion.pk for suggestion in pending]
+        model.objects.filter(pk__in=rejected).update(status='rejected')
+        for pk in rejected:
+            results[pk] = 'rejected'
+        if model is NewWordSuggestion and rejected:
+            new_word_suggestions_changed(rejected)
+
+    return Response({'results': {str(pk): results[pk] for pk in ids}}, status=status.HTTP_200_OK)
+
 @api_view(['GET'])
 def getSuggestionsForWord(request, pk):
     try:
-        suggestions_for_word = SuggestionToVocabularyItem.objects.filter(vocabulary_item_id=pk)
+        suggestions_for_word = SuggestionToVocabularyItem.objects.filter(vocabulary_item_id=pk).with_like_info(request.user)
         serializer = SuggestionToVocabularyItemSerializer(suggestions_for_word, many=True)
         return Response(serializer.data)
     except Exception as e:
@@ -221,8 +368,8 @@ def getSuggestionsForWord(request, pk):
 @api_view(['GET'])
 def getAllSuggestionsForAllWords(request):
     try:
-        existing_word_suggestions = SuggestionToVocabularyItem.objects.all()
-        new_word_suggestions = NewWordSuggestion.objects.all()
+        existing_word_suggestions = SuggestionToVocabularyItem.objects.with_like_info(request.user)
+        new_word_suggestions = NewWordSuggestion.objects.with_like_info(request.user)
 
         existing_word_serializer = SuggestionToVocabularyItemSerializer(existing_word_suggestions, many=True)
         new_word_serializer = NewWordSuggestionSerializer(new_word_suggestions, many=True)
@@ -237,17 +384,80 @@ def getAllSuggestionsForAllWords(request):
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+QUEUE_SORTS = {
+    # sort name: (ordering, cursor size)
+    'likes': (['-like_count', '-id'], 2),
+    'newest': (['-id'], 1),
+    'oldest': (['id'], 1),
+}
+
+@api_view(['GET'])
+def getModerationQueue(request):
+    kind = request.GET.get('kind', 'vocabulary')
+    if kind == 'vocabulary':
+        queryset = SuggestionToVocabularyItem.objects.select_related('vocabulary_item')
+        serializer_class = ModerationVocabularySuggestionSerializer
+    elif kind == 'new_word':
+        queryset = NewWordSuggestion.objects.all()
+        serializer_class = NewWordSuggestionSerializer
+    else:
+        return Response({'error': 'Invalid suggestion kind'}, status=status.HTTP_400_BAD_REQUEST)
+
+    sort = request.GET.get('sort', 'likes')
+    if sort not in QUEUE_SORTS:
+        return Response({'error': 'Invalid sort'}, status=status.HTTP_400_BAD_REQUEST)
+    ordering, cursor_size = QUEUE_SORTS[sort]
+
+    try:
+        limit = get_limit(request, default=50, maximum=200)
+        cursor = get_cursor(request, size=cursor_size)
+        if cursor is not None and not all(isinstance(value, int) for value in cursor):
+            raise InvalidPageRequest('Invalid cursor')
+    except InvalidPageRequest as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    suggestion_status = request.GET.get('status', 'pending')
+    if suggestion_status != 'all':
+        queryset = queryset.filter(status=suggestion_status)
+    if request.GET.get('language'):
+        queryset = queryset.filter(language=request.GET['language'])
+    if kind == 'vocabulary':
+        if request.GET.get('type'):
+            queryset = queryset.filter(suggestion_type=request.GET['type'])
+        if request.GET.get('vocabulary_item'):
+            queryset = queryset.filter(vocabulary_item_id=request.GET['vocabulary_item'])
+
+    if cursor is not None:
+        if sort == 'likes':
+            like_count, last_id = cursor
+            queryset = queryset.filter(Q(like_count__lt=like_count) | Q(like_count=like_count, id__lt=last_id))
+        elif sort == 'newest':
+            queryset = queryset.filter(id__lt=cursor[0])
+        else:
+            queryset = queryset.filter(id__gt=cursor[0])
+
+    queryset = queryset.with_like_info(request.user).order_by(*ordering)
+    if sort == 'likes':
+        suggestions, next_cursor = paginate(queryset, limit, lambda s: [s.like_count, s.id])
+    else:
+        suggestions, next_cursor = paginate(queryset, limit, lambda s: [s.id])
+
+    results = serializer_class(suggestions, many=True).data
+    if kind == 'new_word' and request.GET.get('cluster') in ('1', 'true'):
+        for row in results:
+            row['possible_duplicates'] = find_possible_duplicates(row['term'], exclude_suggestion=row['id'])
+
+    return Response({
+        'results': results,
+        'next_cursor': next_cursor,
+    })
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def like_vocabulary_suggestion(request, pk):
     try:
-        suggestion = SuggestionToVocabularyItem.objects.get(pk=pk)
-        if request.user in suggestion.likes.all():
-            suggestion.likes.remove(request.user)
-            return Response({'liked': False, 'like_count': suggestion.like_count})
-        else:
-            suggestion.likes.add(request.user)
-            return Response({'liked': True, 'like_count': suggestion.like_count})
+        liked, like_count = SuggestionToVocabularyItem.objects.toggle_like(pk, request.user)
+        return Response({'liked': liked, 'like_count': like_count})
     except SuggestionToVocabularyItem.DoesNotExist:
         return Response({'error': 'Suggestion not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -255,12 +465,7 @@ def like_vocabulary_suggestion(request, pk):
 @permission_classes([IsAuthenticated])
 def like_new_word_suggestion(request, pk):
     try:
-        suggestion = NewWordSuggestion.objects.get(pk=pk)
-        if request.user in suggestion.likes.all():
-            suggestion.likes.remove(request.user)
-            return Response({'liked': False, 'like_count': suggestion.like_count})
-        else:
-            suggestion.likes.add(request.user)
-            return Response({'liked': True, 'like_count': suggestion.like_count})
+        liked, like_count = NewWordSuggestion.objects.toggle_like(pk, request.user)
+        return Response({'liked': liked, 'like_count': like_count})
     except NewWordSuggestion.DoesNotExist:
         return Response({'error': 'Suggestion not found'}, status=status.HTTP_404_NOT_FOUND)
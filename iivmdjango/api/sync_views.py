@@ -0,0 +1,36 @@
+from rest_framework.response import Response
+from rest_framework.decorators import api_view
+from rest_framework import status
+from .serializers import VocabularyItemSerializer
+from .models import VocabularyItem
+from . import changelog
+
+@api_view(['GET'])
+def syncVocabulary(request):
+    """
+    Incremental sync for offline clients. `since` is the token returned by
+    the previous call (0 or absent on first sync). When the log cannot
+    bridge the gap the response has `reset: true` and the client should
+    refetch /vocabulary-items/ and its saved list, then sync from `token`.
+    """
+    try:
+        since = int(request.GET.get('since', 0))
+    except ValueError:
+        return Response({'detail': 'since must be an integer token'}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = request.user if request.user.is_authenticated else None
+    token, changes = changelog.changes_since(since, user) if since > 0 else (changelog.current_token(), None)
+    if changes is None:
+        return Response({'token': token, 'reset': True})
+
+    items = VocabularyItem.objects.filter(pk__in=changes['changed']).prefetch_related('translations')
+    data = {
+        'token': token,
+        'reset': False,
+        'items': VocabularyItemSerializer(items, many=True).data,
+        'deleted_items': changes['deleted'],
+    }
+    if user is not None:
+        data['saved'] = changes['saved']
+        data['unsaved'] = changes['unsaved']
+    return Response(data)
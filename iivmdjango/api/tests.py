@@ -0,0 +1,1066 @@
+import gzip
+import io
+import json
+import warnings
+from datetime import timedelta
+
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache.backends.base import CacheKeyWarning
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from djangobackend.models import UserProfile
+
+from . import benchmark, categories, changelog, importer, request_metrics, search, vocabulary_cache
+from .export import iter_ndjson
+from .pagination import encode_cursor
+from .serializers import VocabularyItemSerializer
+from .item_ids import assign_item_ids, content_id
+from .translation_merge import MAX_REPORTED_MISSING, merge_translations
+from .fuzzy import bounded_levenshtein, fuzzy_index
+from .signals import IN_MEMORY_INDEXES, vocabulary_changed
+from .similarity import find_possible_duplicates, suggestion_similarity_index
+from .models import (
+    VocabularyItem, Translation, NewWordSuggestion, SuggestionToVocabularyItem, SavedVocabularyItem, ChangeLogEntry,
+)
+from .typeahead import prefix_index
+
+
+def create_vocabulary(count, start=0):
+    for i in range(start, start + count):
+        item = VocabularyItem.objects.create(
+            id=f'item{i}',
+            term=f'Term {i}',
+            definition='definition',
+            category='symptoms' if i % 2 else 'diseases',
+        )
+        Translation.objects.create(vocabulary_item=item, language='pl', translation=f'Termin {i}', is_primary=True)
+        Translation.objects.create(vocabulary_item=item, language='pl', translation=f'Potocznie {i}', is_colloquial=True)
+        Translation.objects.create(vocabulary_item=item, language='de', translation=f'Begriff {i}', is_user_proposed=True)
+        Translation.objects.create(vocabulary_item=item, language='pl', translation=f'Propozycja {i}', is_user_proposed=True)
+
+
+class VocabularyTestCase(TestCase):
+    def setUp(self):
+        vocabulary_cache.clear()
+        # Indexes built by an earlier test would otherwise start a background
+        # rebuild against this test's transaction.
+        for index in IN_MEMORY_INDEXES + [suggestion_similarity_index]:
+            index.invalidate()
+
+
+class VocabularyItemSerializerTests(VocabularyTestCase):
+    def test_all_vocabulary_items_query_count_is_constant(self):
+        create_vocabulary(3)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('vocabulary-items'))
+        self.assertEqual(len(response.json()), 3)
+
+        create_vocabulary(12, start=3)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('vocabulary-items'))
+        self.assertEqual(len(response.json()), 15)
+
+    def test_translations_are_grouped_by_language(self):
+        create_vocabulary(1)
+        item = self.client.get(reverse('vocabulary-items')).json()[0]
+        self.assertEqual(item['primary_translations'], {'pl': 'Termin 0'})
+        self.assertEqual(item['colloquial_terms'], {'pl': ['Potocznie 0']})
+        self.assertEqual(item['user_proposed_translations'], {'de': ['Begriff 0'], 'pl': ['Propozycja 0']})
+
+
+class VocabularyCacheTests(VocabularyTestCase):
+    def test_all_vocabulary_items_served_from_cache(self):
+        create_vocabulary(2)
+        first = self.client.get(reverse('vocabulary-items'))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('vocabulary-items'))
+        self.assertEqual(first.content, second.content)
+
+    def test_translation_write_invalidates_cached_payload(self):
+        create_vocabulary(1)
+        self.client.get(reverse('vocabulary-items'))
+        Translation.objects.create(
+            vocabulary_item_id='item0', language='de', translation='Neu', is_primary=True
+        )
+        item = self.client.get(reverse('vocabulary-items')).json()[0]
+        self.assertEqual(item['primary_translations'], {'pl': 'Termin 0', 'de': 'Neu'})
+
+    def test_empty_vocabulary_is_not_cached(self):
+        self.assertEqual(self.client.get(reverse('vocabulary-items')).status_code, 404)
+        create_vocabulary(1)
+        self.assertEqual(self.client.get(reverse('vocabulary-items')).status_code, 200)
+
+
+class ConditionalVocabularyTests(VocabularyTestCase):
+    def test_matching_etag_returns_not_modified_without_queries(self):
+        create_vocabulary(2)
+        for url in [
+            reverse('vocabulary-items'),
+            reverse('vocabulary-items-detail', args=['item0']),
+            reverse('vocabulary-items-by-category', args=['diseases']),
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            self.assertFalse(etag.startswith('W/'))
+            self.assertIn('Last-Modified', response)
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_etag(self):
+        create_vocabulary(1)
+        etag = self.client.get(reverse('vocabulary-items'))['ETag']
+        Translation.objects.filter(vocabulary_item_id='item0').first().delete()
+        response = self.client.get(reverse('vocabulary-items'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class VocabularyPaginationTests(VocabularyTestCase):
+    def test_cursor_pagination_walks_all_items(self):
+        create_vocabulary(5)
+        url = reverse('vocabulary-items')
+        seen = []
+        params = {'limit': 2}
+        while True:
+            page = self.client.get(url, params).json()
+            seen.extend(item['id'] for item in page['results'])
+            if page['next_cursor'] is None:
+                break
+            params['cursor'] = page['next_cursor']
+        self.assertEqual(seen, sorted(f'item{i}' for i in range(5)))
+
+    def test_field_projection_and_compact_mode(self):
+        create_vocabulary(1)
+        url = reverse('vocabulary-items')
+        item = self.client.get(url, {'fields': 'term,primary_translations'}).json()['results'][0]
+        self.assertEqual(item, {'id': 'item0', 'term': 'Term 0', 'primary_translations': {'pl': 'Termin 0'}})
+
+        item = self.client.get(url, {'compact': '1'}).json()['results'][0]
+        self.assertNotIn('translations', item)
+        self.assertIn('colloquial_terms', item)
+
+    def test_projection_without_translations_skips_prefetch(self):
+        create_vocabulary(3)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('vocabulary-items'), {'fields': 'term'})
+
+    def test_invalid_parameters_are_rejected(self):
+        url = reverse('vocabulary-items')
+        self.assertEqual(self.client.get(url, {'fields': 'secret'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'cursor': '!!'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': '0'}).status_code, 400)
+        for values in ([None], [{}]):
+            self.assertEqual(self.client.get(url, {'cursor': encode_cursor(values)}).status_code, 400)
+
+    def test_page_cache_ignores_unknown_parameters(self):
+        create_vocabulary(3)
+        url = reverse('vocabulary-items')
+        first = self.client.get(url, {'limit': 2, 'junk': 'a'})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'junk': 'b b', 'limit': '2'})
+        self.assertEqual(first.content, second.content)
+
+
+class VocabularyExportTests(VocabularyTestCase):
+    def test_export_streams_one_item_per_line(self):
+        create_vocabulary(3)
+        response = self.client.get(reverse('export-vocabulary'))
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], ['item0', 'item1', 'item2'])
+        self.assertEqual(json.loads(lines[0])['primary_translations'], {'pl': 'Termin 0'})
+
+    def test_export_is_gzipped_on_request(self):
+        create_vocabulary(2)
+        response = self.client.get(reverse('export-vocabulary'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).splitlines()
+        self.assertEqual(len(lines), 2)
+
+    def test_export_etag_and_encoding_follow_accept_encoding(self):
+        create_vocabulary(1)
+        url = reverse('export-vocabulary')
+        identity = self.client.get(url)
+        gzipped = self.client.get(url, HTTP_ACCEPT_ENCODING='br, gzip;q=0.5')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertNotEqual(identity['ETag'], gzipped['ETag'])
+        self.assertIn('Accept-Encoding', gzipped['Vary'])
+
+        refused = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, deflate')
+        self.assertFalse(refused.has_header('Content-Encoding'))
+        self.assertEqual(refused['ETag'], identity['ETag'])
+
+        revalidated = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=identity['ETag'])
+        self.assertEqual(revalidated.status_code, 200)
+
+    def test_export_prefetches_per_chunk(self):
+        create_vocabulary(5)
+        with self.assertNumQueries(4):
+            blobs = list(iter_ndjson(chunk_size=2))
+        self.assertEqual(len(blobs), 3)
+
+
+class VocabularyImportTests(VocabularyTestCase):
+    def run_import(self, text, **options):
+        stdout = io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO(text)), self.captureOnCommitCallbacks(execute=True):
+            call_command('import_vocabulary', '-', stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_json_array_is_parsed_across_reads(self):
+        records = [{'term': f'Term {i}', 'category': 'diseases', 'value': 1.5e3} for i in range(20)]
+        with mock.patch.object(importer, 'READ_SIZE', 7):
+            parsed = list(importer.iter_records(io.StringIO('  ' + json.dumps(records, indent=1))))
+        self.assertEqual(parsed, records)
+        with self.assertRaises(importer.InvalidImportData):
+            list(importer.iter_records(io.StringIO('[{"term": "x"}, ')))
+
+    def test_upsert_merges_by_term(self):
+        create_vocabulary(1)
+        output = self.run_import(json.dumps([
+            {'term': 'TERM 0', 'category': 'symptoms', 'definition': 'new', 'translations': {'pl': 'Termin 0', 'de': 'Neu'}},
+            {'term': 'Fresh', 'category': 'diseases', 'translations': {'pl': 'Świeży'}, 'acronymExtendedName': 'F.'},
+        ]), batch_size=1)
+        self.assertIn('2 record(s): 1 item(s) created, 1 updated, 0 deleted, 3 translation(s) added', output)
+
+        item = VocabularyItem.objects.get(pk='item0')
+        self.assertEqual((item.category, item.definition), ('symptoms', 'new'))
+        self.assertEqual(item.translations.filter(translation='Termin 0').count(), 1)
+        fresh = VocabularyItem.objects.get(term='Fresh')
+        self.assertEqual(fresh.definition, importer.DEFAULT_DEFINITION)
+        self.assertEqual(sorted(fresh.translations.values_list('translation', 'is_primary')), [('F.', False), ('Świeży', True)])
+        self.assertEqual(prefix_index.suggest('fre')[0]['id'], fresh.pk)
+
+        self.assertIn('0 item(s) created, 0 updated, 0 deleted, 0 translation(s) added', self.run_import(json.dumps([
+            {'term': 'Fresh', 'category': 'diseases', 'translations': {'pl': 'Świeży'}},
+        ])))
+
+    def test_upsert_is_idempotent_for_non_ascii_terms(self):
+        records = json.dumps([{'term': 'Łuszczyca', 'category': 'diseases', 'translations': {'pl': 'Łuszczyca'}}])
+        self.run_import(records)
+        self.assertIn('0 item(s) created, 0 updated, 0 deleted, 0 translation(s) added', self.run_import(records))
+        self.assertEqual(VocabularyItem.objects.filter(term='Łuszczyca').count(), 1)
+
+    def test_constraint_violations_are_reported_as_command_errors(self):
+        create_vocabulary(1)
+        with mock.patch.object(VocabularyItem.objects, 'matching_terms', return_value=VocabularyItem.objects.none()):
+            with self.assertRaisesMessage(CommandError, 'Import rolled back after 0 record(s)'):
+                self.run_import(json.dumps([{'term': 'Term 0', 'category': 'diseases'}]))
+        self.assertEqual(VocabularyItem.objects.count(), 1)
+
+    def test_replace_keeps_ids_of_listed_items(self):
+        create_vocabulary(3)
+        user = User.objects.create_user('interpreter', password='pw')
+        SavedVocabularyItem.objects.create(user=user, vocabulary_item_id='item1')
+        exported = b''.join(iter_ndjson()).decode().splitlines()
+        Translation.objects.filter(translation='Potocznie 1').update(is_colloquial=False)
+        Translation.objects.create(vocabulary_item_id='item1', language='en', translation='Stray')
+
+        output = self.run_import('\n'.join(exported[1:]), mode='replace')
+        self.assertIn('0 item(s) created, 0 updated, 1 deleted, 8 translation(s) added', output)
+        self.assertEqual(list(VocabularyItem.objects.order_by('pk').values_list('pk', flat=True)), ['item1', 'item2'])
+        self.assertEqual(
+            sorted(Translation.objects.filter(vocabulary_item_id='item1').values_list('translation', 'is_colloquial')),
+            [('Begriff 1', False), ('Potocznie 1', True), ('Propozycja 1', False), ('Termin 1', False)],
+        )
+        self.assertTrue(SavedVocabularyItem.objects.filter(user=user, vocabulary_item_id='item1').exists())
+
+
+class ContentAddressedIdTests(VocabularyTestCase):
+    def test_ids_follow_the_folded_term_and_category(self):
+        self.assertEqual(content_id('Heart  Attack', 'diseases'), content_id('heart attack', 'diseases'))
+        self.assertNotEqual(content_id('heart attack', 'diseases'), content_id('heart attack', 'symptoms'))
+        self.assertRegex(content_id('heart attack', 'diseases'), r'^[a-z2-7]{10}$')
+
+        serializer = VocabularyItemSerializer(data={'term': 'Fresh', 'definition': 'd', 'category': 'diseases'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.save().pk, content_id('fresh', 'diseases'))
+
+    def test_taken_ids_are_rehashed_with_a_salt(self):
+        VocabularyItem.objects.create(id=content_id('Fresh', 'diseases'), term='Squatter', definition='', category='x')
+        self.assertEqual(
+            assign_item_ids([('Fresh', 'diseases'), ('fresh', 'diseases')]),
+            [content_id('Fresh', 'diseases', 1), content_id('Fresh', 'diseases', 2)],
+        )
+
+    def test_reimport_reproduces_ids(self):
+        records = [{'term': 'Fresh', 'category': 'diseases'}, {'term': 'Stale', 'category': 'symptoms'}]
+        importer.import_vocabulary(records)
+        ids = set(VocabularyItem.objects.values_list('pk', flat=True))
+        VocabularyItem.objects.all().delete()
+        importer.import_vocabulary(records)
+        self.assertEqual(set(VocabularyItem.objects.values_list('pk', flat=True)), ids)
+
+
+class TranslationMergeTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        create_vocabulary(3)
+        self.records = [
+            {'id': 'item0', 'translations': {'pl': 'Termin 0', 'de': 'Begriff 0'}, 'acronymExtendedName': 'Term zero'},
+            {'id': 'item1', 'translations': {'de': 'Begriff 1'}},
+            {'id': 'gone', 'translations': {'pl': 'Nic'}},
+            {'id': 'old-id', 'term': 'TERM 2', 'translations': {'en': 'Term two'}},
+        ]
+
+    def test_merge_is_set_based_and_idempotent(self):
+        with self.assertNumQueries(12):
+            stats = merge_translations(self.records, batch_size=10)
+        self.assertEqual(
+            (stats.items_matched, stats.translations_added, stats.translations_updated, stats.translations_unchanged),
+            (3, 2, 2, 1),
+        )
+        self.assertEqual((stats.missing_count, stats.missing_ids), (1, ['gone']))
+        self.assertTrue(Translation.objects.get(vocabulary_item_id='item1', translation='Begriff 1').is_primary)
+        self.assertEqual(Translation.objects.get(translation='Term zero').language, 'en')
+        self.assertEqual(Translation.objects.get(translation='Term two').vocabulary_item_id, 'item2')
+
+        stats = merge_translations(self.records)
+        self.assertEqual((stats.translations_added, stats.translations_updated, stats.translations_unchanged), (0, 0, 5))
+
+    def test_unknown_ids_fall_back_to_non_ascii_terms(self):
+        VocabularyItem.objects.create(id='lu', term='Łuszczyca', definition='', category='diseases')
+        stats = merge_translations([{'id': 'old-lu', 'term': 'Łuszczyca', 'translations': {'de': 'Schuppenflechte'}}])
+        self.assertEqual((stats.items_matched, stats.missing_count), (1, 0))
+        self.assertEqual(Translation.objects.get(translation='Schuppenflechte').vocabulary_item_id, 'lu')
+
+    def test_only_the_first_unknown_ids_are_kept(self):
+        records = [{'id': f'gone-{i}', 'translations': {'pl': 'Nic'}} for i in range(MAX_REPORTED_MISSING + 5)]
+        stats = merge_translations(records)
+        self.assertEqual(stats.missing_count, MAX_REPORTED_MISSING + 5)
+        self.assertEqual(stats.missing_ids, [f'gone-{i}' for i in range(MAX_REPORTED_MISSING)])
+        self.assertIn('(+5 more)', stats.summary())
+
+    def test_dry_run_reports_without_writing(self):
+        stdout = io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO(json.dumps(self.records))):
+            call_command('merge_translations', '-', dry_run=True, stdout=stdout)
+        self.assertIn('2 translation(s) added, 2 updated, 1 unchanged', stdout.getvalue())
+        self.assertIn('1 unknown item id(s) skipped: gone', stdout.getvalue())
+        self.assertEqual(Translation.objects.count(), 12)
+
+
+class BenchmarkHarnessTests(VocabularyTestCase):
+    def test_synthetic_records_are_reproducible(self):
+        records = list(benchmark.synthetic_records(200, seed=3))
+        self.assertEqual(records, list(benchmark.synthetic_records(200, seed=3)))
+        self.assertEqual(len({record['term'].lower() for record in records}), 200)
+
+    def test_measures_every_scenario(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = benchmark.generate_dataset(100)[0]
+        self.assertEqual(VocabularyItem.objects.count(), 100)
+        self.assertEqual(SuggestionToVocabularyItem.objects.count(), 10)
+        for scenario in benchmark.build_scenarios():
+            result = benchmark.measure(scenario, user, iterations=3)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'], scenario.name)
+            self.assertGreater(result['queries_max'], 0, scenario.name)
+
+
+class SearchVocabularyTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        for item_id, term, translation in [
+            ('h1', 'Hypertension', 'Nadciśnienie'),
+            ('h2', 'Pulmonary hypertension', 'Nadciśnienie płucne'),
+            ('h3', 'Hypotension', 'Niedociśnienie'),
+        ]:
+            item = VocabularyItem.objects.create(id=item_id, term=term, definition='', category='diseases')
+            Translation.objects.create(vocabulary_item=item, language='pl', translation=translation, is_primary=True)
+
+    def search(self, **params):
+        response = self.client.get(reverse('search-vocabulary'), params)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()]
+
+    def test_exact_and_prefix_matches_rank_first(self):
+        self.assertEqual(self.search(q='hypertension'), ['h1', 'h2'])
+        self.assertEqual(self.search(q='hypo'), ['h3'])
+
+    def test_translations_match_without_diacritics(self):
+        self.assertEqual(self.search(q='nadcisnienie'), ['h1', 'h2'])
+        self.assertEqual(self.search(q='plucne'), ['h2'])
+
+    def test_index_follows_writes(self):
+        Translation.objects.create(vocabulary_item_id='h3', language='de', translation='Hypotonie')
+        self.assertEqual(self.search(q='hypotonie'), ['h3'])
+        VocabularyItem.objects.get(pk='h1').delete()
+        self.assertEqual(self.search(q='hypertension'), ['h2'])
+
+    def test_language_filter(self):
+        self.assertEqual(self.search(q='hypertension', lang='de'), [])
+
+    def test_language_filter_is_applied_before_the_limit(self):
+        Translation.objects.create(vocabulary_item_id='h2', language='de', translation='Lungenhochdruck')
+        self.assertEqual(self.search(q='hypertension', lang='de', limit=1), ['h2'])
+        self.assertEqual(self.search(q='hypertention', lang='de', limit=1, fuzzy=1), ['h2'])
+
+
+class TypeaheadTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        prefix_index.invalidate()
+        for item_id, term, translation in [
+            ('h1', 'Hypertension', 'Nadciśnienie'),
+            ('h2', 'Pulmonary hypertension', 'Nadciśnienie płucne'),
+            ('h3', 'Heart', 'Serce'),
+        ]:
+            item = VocabularyItem.objects.create(id=item_id, term=term, definition='', category='diseases')
+            Translation.objects.create(vocabulary_item=item, language='pl', translation=translation, is_primary=True)
+
+    def suggest(self, **params):
+        response = self.client.get(reverse('typeahead'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_prefix_matches_terms_and_inner_words(self):
+        self.assertEqual([s['id'] for s in self.suggest(q='hyper')], ['h1', 'h2'])
+        self.assertEqual([s['id'] for s in self.suggest(q='h')], ['h3', 'h1', 'h2'])
+
+    def test_diacritic_insensitive_translation_match(self):
+        suggestions = self.suggest(q='nadcisnienie', lang='pl')
+        self.assertEqual(suggestions[0], {
+            'id': 'h1', 'term': 'Hypertension', 'match': 'Nadciśnienie', 'language': 'pl',
+        })
+        self.assertEqual(self.suggest(q='plucne')[0]['id'], 'h2')
+
+    def test_approved_translation_is_added_incrementally(self):
+        self.suggest(q='serce')
+        with self.captureOnCommitCallbacks(execute=True):
+            Translation.objects.create(vocabulary_item_id='h3', language='pl', translation='Mięsień sercowy')
+        self.assertEqual(self.suggest(q='miesien')[0]['match'], 'Mięsień sercowy')
+
+
+class FuzzySearchTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        fuzzy_index.invalidate()
+        for item_id, term, translation in [
+            ('h1', 'Hypertension', 'Nadciśnienie'),
+            ('a1', 'Abscess', 'Ropień'),
+            ('a2', 'Acid reflux', 'Refluks żołądkowo-przełykowy'),
+        ]:
+            item = VocabularyItem.objects.create(id=item_id, term=term, definition='', category='diseases')
+            Translation.objects.create(vocabulary_item=item, language='pl', translation=translation, is_primary=True)
+
+    def search(self, q):
+        response = self.client.get(reverse('search-vocabulary'), {'q': q, 'fuzzy': '1'})
+        return [item['id'] for item in response.json()]
+
+    def test_misspelled_terms_are_found(self):
+        self.assertEqual(self.search('hypertention'), ['h1'])
+        self.assertEqual(self.search('absess'), ['a1'])
+        self.assertEqual(self.search('acid reflax'), ['a2'])
+        self.assertEqual(self.search('nadcisnenie'), ['h1'])
+
+    def test_distant_words_do_not_match(self):
+        self.assertEqual(self.search('hypotension'), ['h1'])
+        self.assertEqual(self.search('hypokalemia'), [])
+
+    def test_refresh_publishes_a_new_state(self):
+        self.search('absess')
+        before = fuzzy_index.current_state()
+        abscess_items = before.items_by_word['abscess']
+        with self.captureOnCommitCallbacks(execute=True):
+            VocabularyItem.objects.filter(pk='a1').update(term='Abscesses')
+            VocabularyItem.objects.get(pk='a1').save()
+        self.assertIsNot(fuzzy_index.current_state(), before)
+        self.assertEqual(abscess_items, {'a1'})
+        self.assertIn('abscess', before.items_by_word)
+        self.assertNotIn('abscess', fuzzy_index.current_state().items_by_word)
+        self.assertEqual(self.search('abscesses'), ['a1'])
+
+    def test_writes_of_one_transaction_are_refreshed_together(self):
+        self.search('absess')
+        with mock.patch.object(fuzzy_index, 'copy_state', wraps=fuzzy_index.copy_state) as copy_state:
+            with self.captureOnCommitCallbacks(execute=True):
+                VocabularyItem.objects.get(pk='a1').save()
+                for translation in Translation.objects.filter(vocabulary_item_id__in=['a1', 'a2']):
+                    translation.save()
+        copy_state.assert_called_once()
+        with mock.patch('threading.Thread') as thread:
+            self.assertEqual(self.search('absess'), ['a1'])
+        thread.assert_not_called()
+
+    def test_bounded_levenshtein(self):
+        self.assertEqual(bounded_levenshtein('absess', 'abscess', 2), 1)
+        self.assertIsNone(bounded_levenshtein('heart', 'liver', 2))
+
+
+class CategoryCatalogueTests(VocabularyTestCase):
+    def test_category_labels_and_counts(self):
+        create_vocabulary(3)
+        url = reverse('get-all-category-labels')
+        self.assertEqual(self.client.get(url).json(), ['diseases', 'symptoms'])
+        self.assertEqual(self.client.get(url, {'counts': '1'}).json(), {'diseases': 2, 'symptoms': 1})
+
+    def test_detail_with_lite_siblings(self):
+        create_vocabulary(3)
+        url = reverse('vocabulary-items-detail', args=['item0'])
+        self.client.get(url, {'siblings': 'lite'})
+        with self.assertNumQueries(2):
+            data = self.client.get(url, {'siblings': 'lite'}).json()
+        self.assertEqual(data['item']['id'], 'item0')
+        self.assertEqual(data['categoryItems'], [{'id': 'item0', 'term': 'Term 0'}, {'id': 'item2', 'term': 'Term 2'}])
+        self.assertEqual(data['categories'], ['diseases', 'symptoms'])
+
+    def test_catalogue_is_invalidated_on_write(self):
+        create_vocabulary(1)
+        url = reverse('get-all-category-labels')
+        self.assertEqual(self.client.get(url).json(), ['diseases'])
+        VocabularyItem.objects.create(id='new', term='New', definition='', category='anatomy')
+        self.assertEqual(self.client.get(url).json(), ['anatomy', 'diseases'])
+
+    def test_category_names_are_not_used_raw_in_cache_keys(self):
+        VocabularyItem.objects.create(id='ear', term='Ear', definition='', category='ear, nose & throat')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            response = self.client.get(reverse('vocabulary-items-detail', args=['ear']))
+        self.assertEqual([item['id'] for item in response.json()['categoryItems']], ['ear'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class QueryPlanTests(VocabularyTestCase):
+    """Every SELECT issued by a hot view must be served by an index."""
+
+    def setUp(self):
+        super().setUp()
+        create_vocabulary(4)
+        self.user = User.objects.create_user(username='interpreter', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        SuggestionToVocabularyItem.objects.create(
+            vocabulary_item_id='item0', suggestion_type='translation', suggestion='Termin', language='de'
+        )
+        # The category catalogue and the duplicate indexes are deliberate
+        # whole-table reads, done once and then reused.
+        categories.get_catalogue()
+        find_possible_duplicates('warm up')
+
+    def assertNoFullScans(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 500)
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = [row[-1] for row in cursor.fetchall()]
+            for step in plan:
+                if step.startswith('SCAN') and 'INDEX' not in step:
+                    self.fail(f'{url} runs a full scan ({step}) for: {sql}')
+
+    def test_vocabulary_views_use_indexes(self):
+        self.assertNoFullScans('get', reverse('vocabulary-items-by-category', args=['diseases']))
+        self.assertNoFullScans('get', reverse('vocabulary-items-detail', args=['item1']))
+        self.assertNoFullScans('get', reverse('get-suggestions-for-specific-word', args=['item0']))
+
+    def test_search_reindex_deletes_by_index(self):
+        backend = search.SqliteFtsBackend()
+        with CaptureQueriesContext(connection) as context:
+            backend.index_items(['item1'])
+        deletes = [query['sql'] for query in context.captured_queries if query['sql'].startswith('DELETE')]
+        self.assertTrue(deletes)
+        for sql in deletes:
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = [row[-1] for row in cursor.fetchall()]
+            self.assertFalse([step for step in plan if step.startswith('SCAN')], sql)
+        self.assertEqual(backend.candidate_ids('term 1', 5), ['item1'])
+
+    def test_suggestion_views_use_indexes(self):
+        self.assertNoFullScans('post', reverse('suggest-new-word'), {
+            'term': 'Tachycardia', 'definition': 'fast heart rate', 'translation': 'Tachykardia',
+            'language': 'pl', 'category': 'symptoms',
+        })
+        self.assertNoFullScans('post', reverse('save-suggestion-for-specific-word'), {
+            'term': 'Term 2', 'suggestionType': 'colloquial', 'suggestion': 'Potoczny', 'language': 'pl',
+        })
+
+
+class SuggestionListingTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        create_vocabulary(1)
+        self.user = User.objects.create_user(username='interpreter', password='secret')
+        self.other = User.objects.create_user(username='overseer', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_suggestions(self, count, start=0):
+        for i in range(start, start + count):
+            suggestion = SuggestionToVocabularyItem.objects.create(
+                vocabulary_item_id='item0', suggestion_type='translation', suggestion=f'S{i}', language='de'
+            )
+            suggestion.likes.add(self.other)
+            new_word = NewWordSuggestion.objects.create(
+                term=f'word {i}', definition='', translation='', language='pl', category='symptoms'
+            )
+            new_word.likes.add(self.user, self.other)
+
+    def test_listing_runs_a_fixed_number_of_queries(self):
+        self.create_suggestions(2)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('get-suggestions-for-all-words'))
+        self.create_suggestions(5, start=2)
+        with self.assertNumQueries(2):
+            data = self.client.get(reverse('get-suggestions-for-all-words')).json()
+        self.assertEqual(len(data['existing_word_suggestions']), 7)
+
+    def test_like_count_and_liked_by_me(self):
+        self.create_suggestions(1)
+        data = self.client.get(reverse('get-suggestions-for-all-words')).json()
+        existing = data['existing_word_suggestions'][0]
+        new_word = data['new_word_suggestions'][0]
+        self.assertEqual((existing['like_count'], existing['liked_by_me']), (1, False))
+        self.assertEqual((new_word['like_count'], new_word['liked_by_me']), (2, True))
+
+        data = self.client.get(reverse('get-suggestions-for-specific-word', args=['item0'])).json()
+        self.assertEqual((data[0]['like_count'], data[0]['liked_by_me']), (1, False))
+
+
+class LikeToggleTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='interpreter', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.suggestion = NewWordSuggestion.objects.create(
+            term='word', definition='', translation='', language='pl', category='symptoms'
+        )
+        self.suggestion.likes.add(User.objects.create_user(username='other', password='secret'))
+
+    def toggle(self, pk):
+        return self.client.post(reverse('like-new-word-suggestion', args=[pk]))
+
+    def test_toggle_like_updates_stored_counter(self):
+        self.assertEqual(self.toggle(self.suggestion.pk).json(), {'liked': True, 'like_count': 2})
+        self.assertEqual(self.toggle(self.suggestion.pk).json(), {'liked': False, 'like_count': 1})
+        self.suggestion.refresh_from_db()
+        self.assertEqual(self.suggestion.like_count, self.suggestion.likes.count())
+
+    def test_toggle_unknown_suggestion(self):
+        self.assertEqual(self.toggle(9999).status_code, 404)
+
+    def test_repair_command_recomputes_counters(self):
+        NewWordSuggestion.objects.update(like_count=42)
+        call_command('repair_like_counts', stdout=io.StringIO())
+        self.suggestion.refresh_from_db()
+        self.assertEqual(self.suggestion.like_count, 1)
+
+
+class ModerationQueueTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        create_vocabulary(2)
+        self.client = APIClient()
+        for i, likes in enumerate([3, 0, 5, 3, 1]):
+            SuggestionToVocabularyItem.objects.create(
+                vocabulary_item_id=f'item{i % 2}', suggestion_type='translation' if i % 2 else 'colloquial',
+                suggestion=f'S{i}', language='de' if i < 4 else 'pl', like_count=likes,
+            )
+        SuggestionToVocabularyItem.objects.create(
+            vocabulary_item_id='item0', suggestion_type='translation', suggestion='done', language='de',
+            status='accepted', like_count=10,
+        )
+
+    def walk(self, **params):
+        pages, cursor = [], None
+        while True:
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get(reverse('moderation-queue'), params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            pages.append([s['suggestion'] for s in data['results']])
+            cursor = data['next_cursor']
+            if cursor is None:
+                return pages
+
+    def test_pending_sorted_by_likes_with_keyset_pages(self):
+        self.assertEqual(self.walk(limit=2), [['S2', 'S3'], ['S0', 'S4'], ['S1']])
+
+    def test_age_sort_and_filters(self):
+        self.assertEqual(self.walk(sort='oldest'), [['S0', 'S1', 'S2', 'S3', 'S4']])
+        self.assertEqual(self.walk(sort='newest', language='de', type='colloquial'), [['S2', 'S0']])
+        self.assertEqual(self.walk(vocabulary_item='item1'), [['S3', 'S1']])
+        self.assertEqual(self.walk(status='accepted'), [['done']])
+
+    def test_rows_include_term_without_extra_queries(self):
+        with self.assertNumQueries(1):
+            data = self.client.get(reverse('moderation-queue')).json()
+        self.assertEqual(data['results'][0]['term'], 'Term 0')
+
+    def test_new_word_kind(self):
+        NewWordSuggestion.objects.create(term='word', definition='', translation='', language='pl', category='x')
+        data = self.client.get(reverse('moderation-queue'), {'kind': 'new_word'}).json()
+        self.assertEqual([s['term'] for s in data['results']], ['word'])
+        self.assertEqual(self.client.get(reverse('moderation-queue'), {'kind': 'other'}).status_code, 400)
+
+
+class BulkModerationTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        create_vocabulary(2)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('overseer', password='pw'))
+
+    def post(self, name, suggestion_type, ids):
+        return self.client.post(reverse(name), {'suggestion_type': suggestion_type, 'ids': ids}, format='json')
+
+    def test_bulk_approve_vocabulary_suggestions(self):
+        pending = [
+            SuggestionToVocabularyItem.objects.create(
+                vocabulary_item_id=f'item{i}', suggestion_type='colloquial', suggestion=f'Nowe {i}', language='pl',
+            ).pk
+            for i in range(2)
+        ]
+        rejected = SuggestionToVocabularyItem.objects.create(
+            vocabulary_item_id='item0', suggestion_type='translation', suggestion='x', language='de', status='rejected',
+        ).pk
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post('approve-suggestions', 'vocabulary', pending + [rejected, 999])
+        self.assertEqual(response.json()['results'], {
+            str(pending[0]): 'accepted', str(pending[1]): 'accepted',
+            str(rejected): 'already_rejected', '999': 'not_found',
+        })
+        self.assertEqual(Translation.objects.filter(translation__startswith='Nowe', is_colloquial=True).count(), 2)
+        self.assertEqual(SuggestionToVocabularyItem.objects.filter(status='accepted').count(), 2)
+        self.assertEqual(prefix_index.suggest('nowe')[0]['match'], 'Nowe 0')
+
+    def test_bulk_approve_new_words_skips_conflicting_terms(self):
+        ids = [
+            NewWordSuggestion.objects.create(term=term, definition='', translation='t', language='pl', category='x').pk
+            for term in ['fresh', 'term 0']
+        ]
+        response = self.post('approve-suggestions', 'new_word', ids)
+        self.assertEqual(list(response.json()['results'].values()), ['accepted', 'conflict'])
+        item = VocabularyItem.objects.get(term='fresh')
+        self.assertTrue(item.translations.get().is_primary)
+        self.assertEqual(NewWordSuggestion.objects.get(pk=ids[1]).status, 'pending')
+
+    def test_bulk_reject_and_validation(self):
+        ids = [
+            NewWordSuggestion.objects.create(term=f'w{i}', definition='', translation='', language='pl', category='x').pk
+            for i in range(3)
+        ]
+        with self.assertNumQueries(4):
+            response = self.post('reject-suggestions', 'new_word', ids)
+        self.assertEqual(set(response.json()['results'].values()), {'rejected'})
+        self.assertEqual(NewWordSuggestion.objects.filter(status='rejected').count(), 3)
+        self.assertEqual(self.post('reject-suggestions', 'new_word', ['a']).status_code, 400)
+        self.assertEqual(self.post('reject-suggestions', 'other', ids).status_code, 400)
+
+
+class TermConflictTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        create_vocabulary(1)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('editor', password='pw'))
+
+    def test_creating_a_term_that_differs_only_by_case_conflicts(self):
+        data = {'term': 'TERM 0', 'definition': 'd', 'translations': {'pl': 'Termin'}}
+        response = self.client.post(reverse('save-vocabulary-item'), data, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('term', response.json()['details'])
+        self.assertEqual(VocabularyItem.objects.count(), 1)
+        self.assertFalse(Translation.objects.filter(translation='Termin').exists())
+
+    def test_new_word_suggestions_for_existing_non_ascii_terms_are_refused(self):
+        VocabularyItem.objects.create(id='lu', term='Łuszczyca', definition='', category='diseases')
+        data = {'term': 'Łuszczyca', 'definition': 'd', 'translation': 't', 'language': 'pl', 'category': 'x'}
+        response = self.client.post(reverse('suggest-new-word'), data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('already exists', response.json()['details']['term'][0])
+        # The case-insensitive lookup is not registered on every CharField.
+        self.assertIsNone(User._meta.get_field('username').get_lookup('lower'))
+
+    def test_approving_a_term_added_after_the_suggestion_conflicts(self):
+        suggestion = NewWordSuggestion.objects.create(
+            term='term 0', definition='', translation='t', language='pl', category='x',
+        )
+        response = self.client.post(reverse('approve-new-word-suggestion', args=[suggestion.pk]))
+        self.assertEqual(response.status_code, 409)
+        suggestion.refresh_from_db()
+        self.assertEqual(suggestion.status, 'pending')
+        self.assertEqual(VocabularyItem.objects.count(), 1)
+
+
+class SuggestionDeduplicationTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        create_vocabulary(1)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('interpreter', password='pw'))
+
+    def test_new_word_duplicates_are_rejected_by_the_constraint(self):
+        data = {'term': 'Nadciśnienie', 'definition': 'd', 'translation': 't', 'language': 'pl', 'category': 'x'}
+        self.assertEqual(self.client.post(reverse('suggest-new-word'), data).status_code, 201)
+        response = self.client.post(reverse('suggest-new-word'), dict(data, term='NADCISNIENIE '))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('already exists', response.json()['details']['term'][0])
+        self.assertEqual(NewWordSuggestion.objects.get().normalized_term, 'nadcisnienie')
+
+    def test_keys_longer_than_the_term_fit(self):
+        # fold() expands ß to ss, so the key can be longer than any term.
+        suggestion = NewWordSuggestion.objects.create(
+            term='ß' * 100, definition='d', translation='t', language='pl', category='x'
+        )
+        suggestion.full_clean()
+        self.assertEqual(len(suggestion.normalized_term), 200)
+
+    def test_vocabulary_suggestion_duplicates_conflict(self):
+        data = {'term': 'Term 0', 'suggestionType': 'colloquial', 'suggestion': 'Łatwe  słowo', 'language': 'pl'}
+        url = reverse('save-suggestion-for-specific-word')
+        self.assertEqual(self.client.post(url, data).status_code, 201)
+        self.assertEqual(self.client.post(url, dict(data, suggestion='latwe slowo')).status_code, 409)
+        self.assertEqual(self.client.post(url, dict(data, language='de')).status_code, 201)
+        self.assertEqual(SuggestionToVocabularyItem.objects.count(), 2)
+
+    def test_legacy_duplicates_can_be_moderated(self):
+        # Duplicates that predate the constraints were left with a NULL key.
+        original = NewWordSuggestion.objects.create(term='Kaszel', definition='', translation='t', language='pl', category='x')
+        legacy = NewWordSuggestion.objects.create(term='Kaszel 2', definition='', translation='t', language='pl', category='x')
+        NewWordSuggestion.objects.filter(pk=legacy.pk).update(term='kaszel', normalized_term=None)
+        response = self.client.post(reverse('reject-suggestion', args=[legacy.pk]), {'suggestion_type': 'new_word'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(NewWordSuggestion.objects.order_by('pk').values_list('status', 'normalized_term')),
+            [('pending', 'kaszel'), ('rejected', None)],
+        )
+        self.assertEqual(original.pk, NewWordSuggestion.objects.get(normalized_term='kaszel').pk)
+
+        suggestions = [
+            SuggestionToVocabularyItem.objects.create(
+                vocabulary_item_id='item0', suggestion_type='translation', suggestion=text, language='pl',
+            )
+            for text in ['Kaszel', 'Kaszel 2']
+        ]
+        SuggestionToVocabularyItem.objects.filter(pk=suggestions[1].pk).update(suggestion='Kaszel', normalized_suggestion=None)
+        for suggestion in suggestions:
+            response = self.client.post(reverse('approve-vocabulary-suggestion', args=[suggestion.pk]))
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(SuggestionToVocabularyItem.objects.filter(status='accepted').count(), 2)
+        self.assertEqual(Translation.objects.filter(translation='Kaszel').count(), 1)
+
+
+class DuplicateDetectionTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        for item_id, term in [('h1', 'Heart attack'), ('h2', 'Heart failure'), ('h3', 'Stroke')]:
+            VocabularyItem.objects.create(id=item_id, term=term, definition='', category='diseases')
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('interpreter', password='pw'))
+
+    def suggest(self, term):
+        data = {'term': term, 'definition': 'd', 'translation': 't', 'language': 'pl', 'category': 'x'}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('suggest-new-word'), data)
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_submit_returns_similar_terms_and_pending_suggestions(self):
+        duplicates = self.suggest('Heart-attacks')['possible_duplicates']
+        self.assertEqual([d['id'] for d in duplicates['vocabulary']], ['h1'])
+        self.assertEqual(duplicates['suggestions'], [])
+
+        created = self.suggest('heart attack!')
+        self.assertEqual(created['possible_duplicates']['vocabulary'][0]['score'], 1.0)
+        self.assertEqual([d['term'] for d in created['possible_duplicates']['suggestions']], ['heart-attacks'])
+
+    def test_moderation_queue_clusters_new_words(self):
+        first = self.suggest('heart attacks')['id']
+        second = self.suggest('stroke patient')['id']
+        data = self.client.get(reverse('moderation-queue'), {'kind': 'new_word', 'cluster': 1}).json()
+        duplicates = {row['id']: row['possible_duplicates'] for row in data['results']}
+        self.assertEqual([d['id'] for d in duplicates[first]['vocabulary']], ['h1'])
+        self.assertEqual(duplicates[second]['suggestions'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('reject-suggestions'), {'suggestion_type': 'new_word', 'ids': [first]}, format='json')
+        self.assertEqual(self.suggest('Heart-attack')['possible_duplicates']['suggestions'], [])
+
+
+class SavedVocabularyTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        create_vocabulary(5)
+        self.user = User.objects.create_user('interpreter', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def save(self, ids):
+        return self.client.post(reverse('save-vocabulary-items-user'), {'vocabulary_ids': ids}, format='json')
+
+    def test_save_and_remove_are_single_statements(self):
+        # Existing-id lookup, insert, change log insert (plus the savepoint).
+        with self.assertNumQueries(5):
+            self.assertEqual(self.save(['item0', 'item1', 'missing']).status_code, 200)
+        self.save(['item1', 'item2'])
+        self.assertEqual(
+            sorted(SavedVocabularyItem.objects.values_list('vocabulary_item_id', flat=True)),
+            ['item0', 'item1', 'item2'],
+        )
+        with self.assertNumQueries(4):
+            self.client.post(reverse('remove-saved-vocabulary-user'), {'vocabulary_ids': ['item1']}, format='json')
+        data = self.client.get(reverse('saved-vocabulary-user')).json()
+        self.assertEqual(sorted(item['id'] for item in data), ['item0', 'item2'])
+        self.assertEqual(self.save('item3').status_code, 400)
+
+    def test_saved_list_keyset_pages_newest_first(self):
+        for i in range(5):
+            self.save([f'item{i}'])
+        pages, cursor = [], None
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(reverse('saved-vocabulary-user'), params).json()
+            pages.append([item['id'] for item in data['results']])
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(pages, [['item4', 'item3'], ['item2', 'item1'], ['item0']])
+        self.assertIn('saved_at', data['results'][0])
+
+
+class SyncTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        create_vocabulary(3)
+        self.user = User.objects.create_user('interpreter', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, since):
+        response = self.client.get(reverse('sync'), {'since': since})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_sync_asks_for_full_download(self):
+        data = self.sync(0)
+        self.assertTrue(data['reset'])
+        self.assertEqual(self.sync(data['token']), {
+            'token': data['token'], 'reset': False, 'items': [], 'deleted_items': [], 'saved': [], 'unsaved': [],
+        })
+
+    def test_returns_only_changes_and_tombstones(self):
+        token = self.sync(0)['token']
+        Translation.objects.create(vocabulary_item_id='item1', language='de', translation='Neu')
+        VocabularyItem.objects.get(pk='item2').delete()
+        self.client.post(reverse('save-vocabulary-items-user'), {'vocabulary_ids': ['item0', 'item1']}, format='json')
+        self.client.post(reverse('remove-saved-vocabulary-user'), {'vocabulary_ids': ['item1']}, format='json')
+
+        data = self.sync(token)
+        self.assertFalse(data['reset'])
+        self.assertEqual([item['id'] for item in data['items']], ['item1'])
+        self.assertIn('Neu', [t['translation'] for t in data['items'][0]['translations']])
+        self.assertEqual(data['deleted_items'], ['item2'])
+        self.assertEqual((data['saved'], data['unsaved']), (['item0'], ['item1']))
+        self.assertEqual(self.sync(data['token'])['items'], [])
+
+    def test_single_item_writes_report_one_change(self):
+        data = {'term': 'Kaszel', 'definition': 'd', 'translations': {'pl': 'Kaszel', 'de': 'Husten', 'es': 'Tos'}}
+        with mock.patch.object(prefix_index, 'refresh_items') as refresh, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('save-vocabulary-item'), data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['translations']), 3)
+        self.assertEqual(ChangeLogEntry.objects.filter(vocabulary_item_id=response.json()['id']).count(), 1)
+        refresh.assert_called_once()
+        self.assertIn(response.json()['id'], refresh.call_args.args[0])
+
+        suggestion = NewWordSuggestion.objects.create(term='katar', definition='', translation='t', language='pl', category='x')
+        with mock.patch.object(prefix_index, 'refresh_items') as refresh, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('approve-new-word-suggestion', args=[suggestion.pk]))
+        item_id = response.json()['vocabulary_item']['id']
+        self.assertEqual(ChangeLogEntry.objects.filter(vocabulary_item_id=item_id).count(), 1)
+        refresh.assert_called_once()
+        self.assertIn(item_id, refresh.call_args.args[0])
+
+    def test_postgres_log_writers_take_turns(self):
+        postgres = mock.MagicMock(vendor='postgresql')
+        with mock.patch.object(changelog, 'connection', postgres):
+            changelog.log_vocabulary_changes(['item0'])
+            changelog.log_saved_changes(self.user, ['item0'])
+        execute = postgres.cursor.return_value.__enter__.return_value.execute
+        self.assertEqual(execute.call_args_list, [mock.call('SELECT pg_advisory_xact_lock(%s)', [changelog.LOG_LOCK_ID])] * 2)
+
+    def test_bulk_rewrite_and_pruning_force_reset(self):
+        token = self.sync(0)['token']
+        vocabulary_changed()
+        self.assertTrue(self.sync(token)['reset'])
+
+        token = self.sync(0)['token']
+        Translation.objects.create(vocabulary_item_id='item0', language='de', translation='Alt')
+        ChangeLogEntry.objects.update(created_at=timezone.now() - timedelta(days=60))
+        call_command('prune_change_log', days=30, stdout=io.StringIO())
+        self.assertTrue(self.sync(token)['reset'])
+        self.assertFalse(self.sync(self.sync(0)['token'])['reset'])
+
+
+@override_settings(REQUEST_METRICS={'ENABLED': True, 'N_PLUS_ONE_THRESHOLD': 10})
+class RequestMetricsTests(VocabularyTestCase):
+    def setUp(self):
+        super().setUp()
+        request_metrics.store.reset()
+        self.client = APIClient()
+
+    def test_server_timing_and_overseer_stats(self):
+        create_vocabulary(2)
+        response = self.client.get(reverse('vocabulary-items-detail', args=['item0']))
+        timing = response['Server-Timing']
+        for name in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(name, timing)
+
+        interpreter = User.objects.create_user('interpreter', password='pw')
+        UserProfile.objects.create(user=interpreter)
+        self.client.force_authenticate(interpreter)
+        self.assertEqual(self.client.get(reverse('request-stats')).status_code, 403)
+
+        overseer = User.objects.create_user('overseer', password='pw')
+        UserProfile.objects.create(user=overseer, user_type='overseer')
+        self.client.force_authenticate(overseer)
+        routes = self.client.get(reverse('request-stats')).json()['routes']
+        detail = routes['GET /vocabulary-items/<str:pk>/']
+        self.assertEqual(detail['requests'], 1)
+        self.assertGreater(detail['max_queries'], 0)
+        self.assertEqual(detail['n_plus_one_requests'], 0)
+
+        self.assertEqual(self.client.delete(reverse('request-stats')).status_code, 204)
+        self.assertNotIn('GET /vocabulary-items/<str:pk>/', self.client.get(reverse('request-stats')).json()['routes'])
+
+    def test_repeated_queries_are_flagged(self):
+        create_vocabulary(12)
+
+        def unprefetched_view(request):
+            # Two translations queries per item: the nested list and the buckets.
+            return JsonResponse(VocabularyItemSerializer(VocabularyItem.objects.all(), many=True).data, safe=False)
+
+        middleware = request_metrics.RequestMetricsMiddleware(unprefetched_view)
+        with self.assertLogs('api.request_metrics', 'WARNING') as logs:
+            response = middleware(RequestFactory().get('/unrouted/'))
+        self.assertIn('24 x SELECT', logs.output[0])
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+        self.assertIn('desc="25 queries"', response['Server-Timing'])
+
+        stats = request_metrics.store.snapshot()['GET <unresolved>']
+        self.assertEqual(stats['n_plus_one_requests'], 1)
+        self.assertEqual(stats['last_n_plus_one']['count'], 24)
+
+    @override_settings(REQUEST_METRICS={'ENABLED': False})
+    def test_disabled_by_default_setting(self):
+        response = self.client.get(reverse('vocabulary-items'))
+        self.assertFalse(response.has_header('Server-Timing'))
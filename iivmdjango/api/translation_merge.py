@@ -0,0 +1,120 @@
+"""
+Set-based merge of translations into existing vocabulary items.
+
+Records are matched to items by id (NDJSON from `manage.py
+export_vocabulary`) or, when the id is unknown, by case-insensitive term as
+`import_vocabulary` does (the glossary in api/mock_data/vocabulary.json
+carries ids the importer does not keep). Each batch costs at most two
+queries for the target items and one for their existing translations; the
+diff against the (vocabulary_item, language, translation) unique key is done
+in memory, and the result is written with `bulk_create(ignore_conflicts=True)`
+and `bulk_update`. Running the same file twice changes nothing.
+"""
+from django.db import transaction
+
+from .importer import DEFAULT_BATCH_SIZE, InvalidImportData, iter_batches, parse_translations
+from .models import VocabularyItem, Translation
+from .signals import bulk_vocabulary_write, vocabulary_changed
+
+FLAGS = ['is_primary', 'is_colloquial', 'is_user_proposed']
+MAX_REPORTED_MISSING = 20
+
+
+class MergeStats:
+    def __init__(self):
+        self.records = 0
+        self.items_matched = 0
+        self.missing_count = 0
+        # The first MAX_REPORTED_MISSING unknown ids, for the summary.
+        self.missing_ids = []
+        self.translations_added = 0
+        self.translations_updated = 0
+        self.translations_unchanged = 0
+
+    def summary(self):
+        lines = [
+            f'{self.records} record(s), {self.items_matched} matched an item',
+            f'{self.translations_added} translation(s) added, {self.translations_updated} updated, '
+            f'{self.translations_unchanged} unchanged',
+        ]
+        if self.missing_count:
+            shown = ', '.join(self.missing_ids)
+            more = self.missing_count - len(self.missing_ids)
+            lines.append(
+                f'{self.missing_count} unknown item id(s) skipped: {shown}' + (f' (+{more} more)' if more else '')
+            )
+        return '\n'.join(lines)
+
+
+def _merge_batch(batch, stats):
+    """Return (translations to insert, translations to update) for one batch."""
+    for record in batch:
+        if not isinstance(record, dict) or not record.get('id'):
+            raise InvalidImportData(f'Each record needs an id: {str(record)[:200]}')
+    item_ids = {str(record['id']) for record in batch}
+    known_ids = set(VocabularyItem.objects.filter(pk__in=item_ids).values_list('pk', flat=True))
+    terms = {record['term'] for record in batch if str(record['id']) not in known_ids and record.get('term')}
+    ids_by_term = {}
+    if terms:
+        for pk, term in VocabularyItem.objects.matching_terms(terms).values_list('pk', 'term'):
+            ids_by_term[term.lower()] = pk
+    translations = Translation.objects.filter(vocabulary_item_id__in=known_ids | set(ids_by_term.values()))
+    existing = {
+        (t.vocabulary_item_id, t.language, t.translation): t
+        for t in translations.only('pk', 'vocabulary_item_id', 'language', 'translation', *FLAGS)
+    }
+
+    inserts, updates, seen = [], [], set()
+    for record in batch:
+        item_id = str(record['id'])
+        if item_id not in known_ids:
+            item_id = ids_by_term.get((record.get('term') or '').lower())
+        if item_id is None:
+            stats.missing_count += 1
+            if len(stats.missing_ids) < MAX_REPORTED_MISSING:
+                stats.missing_ids.append(str(record['id']))
+            continue
+        stats.items_matched += 1
+        for language, text, *flags in parse_translations(record):
+            key = (item_id, language, text)
+            # The first occurrence wins, so an acronym expansion cannot demote
+            # a primary translation with the same text.
+            if key in seen:
+                continue
+            seen.add(key)
+            wanted = dict(zip(FLAGS, flags))
+            translation = existing.get(key)
+            if translation is None:
+                inserts.append(Translation(vocabulary_item_id=item_id, language=language, translation=text, **wanted))
+            elif any(getattr(translation, flag) != value for flag, value in wanted.items()):
+                for flag, value in wanted.items():
+                    setattr(translation, flag, value)
+                updates.append(translation)
+            else:
+                stats.translations_unchanged += 1
+    return inserts, updates
+
+
+def merge_translations(records, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Merge the translations of `records` into existing items in one
+    transaction. With `dry_run` nothing is written; the returned stats
+    describe what would have changed.
+    """
+    stats = MergeStats()
+    touched = set()
+
+    with transaction.atomic(), bulk_vocabulary_write():
+        for batch in iter_batches(records, batch_size):
+            inserts, updates = _merge_batch(batch, stats)
+            stats.records += len(batch)
+            stats.translations_added += len(inserts)
+            stats.translations_updated += len(updates)
+            if dry_run:
+                continue
+            Translation.objects.bulk_create(inserts, ignore_conflicts=True)
+            Translation.objects.bulk_update(updates, FLAGS)
+            touched.update(t.vocabulary_item_id for t in inserts + updates)
+        if touched:
+            vocabulary_changed(touched)
+    return stats
@@ -0,0 +1,103 @@
+"""
+Prefix index for interpreter typeahead.
+
+Every term and translation is folded (see normalization.fold) and inserted
+into a sorted array once per word start, so "nadcis" finds "Nadciśnienie"
+and "hyper" finds "Pulmonary hypertension". Lookups are a bisect plus a
+short forward scan.
+"""
+from bisect import bisect_left, insort
+
+from .lexicon_index import LexiconIndex, writable
+from .normalization import fold
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+class PrefixIndexState:
+    def __init__(self):
+        # Sorted (key, item_id, text, language, word_position) tuples.
+        self.keys = []
+        self.keys_by_item = {}
+        self.terms = {}
+        # During a full build rows are appended and sorted once at the end.
+        self.building = True
+
+
+class PrefixIndex(LexiconIndex):
+    def empty_state(self):
+        return PrefixIndexState()
+
+    def copy_state(self, state):
+        copy = PrefixIndexState()
+        copy.keys = list(state.keys)
+        copy.keys_by_item = dict(state.keys_by_item)
+        copy.terms = dict(state.terms)
+        copy.building = state.building
+        return copy
+
+    def add_entry(self, state, entry):
+        if entry.kind == 'term':
+            state.terms[entry.item_id] = entry.text
+        folded = fold(entry.text)
+        item_keys = writable(state, state.keys_by_item, entry.item_id, list)
+        for position, key in enumerate(_word_suffixes(folded)):
+            row = (key, entry.item_id, entry.text, entry.language, position)
+            if state.building:
+                state.keys.append(row)
+            else:
+                insort(state.keys, row)
+            item_keys.append(row)
+
+    def finalize_state(self, state):
+        state.keys.sort()
+        state.building = False
+
+    def remove_item(self, state, item_id):
+        state.terms.pop(item_id, None)
+        for row in state.keys_by_item.pop(item_id, []):
+            index = bisect_left(state.keys, row)
+            if index < len(state.keys) and state.keys[index] == row:
+                del state.keys[index]
+
+    def suggest(self, query, language='', limit=DEFAULT_LIMIT):
+        prefix = fold(query)
+        if not prefix:
+            return []
+        state = self.current_state()
+        keys = state.keys
+
+        # Scan a bounded window of matches and keep the best one per item:
+        # exact match, then match at the start of the text, then shortest.
+        best = {}
+        scanned = 0
+        index = bisect_left(keys, (prefix,))
+        while index < len(keys) and keys[index][0].startswith(prefix) and scanned < limit * 20:
+            key, item_id, text, text_language, position = keys[index]
+            index += 1
+            if language and text_language != language:
+                continue
+            scanned += 1
+            rank = (key != prefix, position, len(text), text)
+            if item_id not in best or rank < best[item_id][0]:
+                best[item_id] = (rank, text, text_language)
+
+        ordered = sorted(best.items(), key=lambda pair: pair[1][0])[:limit]
+        return [
+            {
+                'id': item_id,
+                'term': state.terms.get(item_id, text),
+                'match': text,
+                'language': text_language,
+            }
+            for item_id, (rank, text, text_language) in ordered
+        ]
+
+
+def _word_suffixes(folded):
+    words = folded.split(' ')
+    return [' '.join(words[start:]) for start in range(len(words))]
+
+
+prefix_index = PrefixIndex()
@@ -2,17 +2,23 @@ from django.urls import path
 from . import vocabulary_views
 from .vocabulary_views import getCategoryLabels
 from . import suggestion_views
+from . import sync_views
+from . import metrics_views
 from .suggestion_views import create_suggestion_for_the_word,create_new_word_suggestion
 
 urlpatterns = [
     # Vocabulary retrieval URLs
     path("vocabulary-items/", vocabulary_views.getAllVocabularyItems, name="vocabulary-items"),
     path("vocabulary-items/<str:pk>/", vocabulary_views.getSpecificVocabularyItem, name="vocabulary-items-detail"),
-    path('vocabulary-items/category/<str:category>/', vocabulary_views.getVocabularyByGroup, name='vocabulary-items-by-category'),
     path('vocabulary-items/category/all-category-labels/', getCategoryLabels, name='get-all-category-labels'),
+    path('vocabulary-items/category/<str:category>/', vocabulary_views.getVocabularyByGroup, name='vocabulary-items-by-category'),
     
+    # Export URL
+    path('export-vocabulary/', vocabulary_views.exportVocabulary, name='export-vocabulary'),
+
     # Search URL
     path('search-vocabulary/', vocabulary_views.searchVocabulary, name='search-vocabulary'),
+    path('typeahead/', vocabulary_views.typeaheadVocabulary, name='typeahead'),
     
     # Vocabulary creation URL
     path('save-vocabulary-item/', vocabulary_views.create_vocabularyItem, name='save-vocabulary-item'),
@@ -22,11 +28,18 @@ urlpatterns = [
     path('save-vocabulary-items-user/', vocabulary_views.saveVocabularyForSavedVocabularyOfUser, name='save-vocabulary-items-user'),
     path('remove-saved-vocabulary-user/', vocabulary_views.removeSavedVocabularyOfUser, name='remove-saved-vocabulary-user'),
     
+    # Incremental sync for offline clients
+    path('sync/', sync_views.syncVocabulary, name='sync'),
+    
+    # Request timings for overseers (see api/request_metrics.py)
+    path('request-stats/', metrics_views.getRequestStats, name='request-stats'),
+    
     # Suggestion-related URLs
     path('suggest-new-word/', create_new_word_suggestion, name='suggest-new-word'),
     path('save-suggestion-for-specific-word/', create_suggestion_for_the_word, name='save-suggestion-for-specific-word'),
     path('get-suggestions-for-specific-word/<str:pk>/', suggestion_views.getSuggestionsForWord, name='get-suggestions-for-specific-word'),
     path('get-suggestions-for-all-words/', suggestion_views.getAllSuggestionsForAllWords, name='get-suggestions-for-all-words'),
+    path('moderation-queue/', suggestion_views.getModerationQueue, name='moderation-queue'),
     
     # Like-related URLs
     path('like-vocabulary-suggestion/<int:pk>/', suggestion_views.like_vocabulary_suggestion, name='like-vocabulary-suggestion'),
@@ -36,4 +49,6 @@ urlpatterns = [
     path('approve-new-word-suggestion/<int:pk>/', suggestion_views.approve_new_word_suggestion, name='approve-new-word-suggestion'),
     path('approve-vocabulary-suggestion/<int:pk>/', suggestion_views.approve_vocabulary_suggestion, name='approve-vocabulary-suggestion'),
     path('reject-suggestion/<int:pk>/', suggestion_views.reject_suggestion, name='reject-suggestion'),
+    path('approve-suggestions/', suggestion_views.bulk_approve_suggestions, name='approve-suggestions'),
+    path('reject-suggestions/', suggestion_views.bulk_reject_suggestions, name='reject-suggestions'),
 ]
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+Versioned cache for rendered vocabulary payloads.
+
+Every write to VocabularyItem/Translation bumps a global vocabulary version
+(see api/signals.py). Rendered JSON bytes are stored under keys that embed
+that version, so stale entries are never served and never need explicit
+deletion. Lookups go through a small per-process LRU first and then through
+the configured Django cache backend, which is shared between workers.
+
+The same version doubles as a strong ETag for the vocabulary read endpoints,
+see `conditional_vocabulary_view`.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+VERSION_KEY = 'vocabulary:version'
+MODIFIED_KEY = 'vocabulary:modified'
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'LOCAL_MAXSIZE': 16,
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'VOCABULARY_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class LocalLRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalLRUCache(get_setting('LOCAL_MAXSIZE'))
+
+
+def shared_cache():
+    return caches[get_setting('ALIAS')]
+
+
+def _initial_version():
+    # Seed from the clock so a flushed shared cache never hands out a version
+    # that a worker may still hold in its local LRU.
+    return int(time.time() * 1000000)
+
+
+def get_version():
+    cache = shared_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _initial_version(), timeout=None)
+        cache.add(MODIFIED_KEY, int(time.time()), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_last_modified():
+    cache = shared_cache()
+    modified = cache.get(MODIFIED_KEY)
+    if modified is None:
+        cache.add(MODIFIED_KEY, int(time.time()), timeout=None)
+        modified = cache.get(MODIFIED_KEY)
+    return datetime.fromtimestamp(modified, tz=timezone.utc)
+
+
+def bump_version():
+    cache = shared_cache()
+    cache.set(MODIFIED_KEY, int(time.time()), timeout=None)
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, _initial_version(), timeout=None)
+        return cache.get(VERSION_KEY)
+
+
+def get_or_build(name, build):
+    """
+    Return the cached value for `name` at the current vocabulary version,
+    calling `build()` on a miss. `build` may return None to signal that
+    nothing should be cached (e.g. an empty vocabulary).
+    """
+    key = f'vocabulary:{name}:{get_version()}'
+    value = local_cache.get(key)
+    if value is not None:
+        return value
+
+    cache = shared_cache()
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        if value is None:
+            return None
+        cache.set(key, value, timeout=get_setting('TIMEOUT'))
+    local_cache.set(key, value)
+    return value
+
+
+def hashed_name(prefix, *parts):
+    """
+    A cache name for request-derived values: `parts` are hashed, so the key
+    stays short and free of characters memcached rejects.
+    """
+    raw = json.dumps(parts, separators=(',', ':'), sort_keys=True)
+    return f"{prefix}:{hashlib.sha256(raw.encode()).hexdigest()[:32]}"
+
+
+def get_or_render(name, render):
+    """Like `get_or_build`, for rendered response bodies (bytes)."""
+    return get_or_build(name, render)
+
+
+def clear():
+    local_cache.clear()
+    shared_cache().delete_many([VERSION_KEY, MODIFIED_KEY])
+
+
+def _vocabulary_etag(request, *args, **kwargs):
+    return f'vocabulary-{get_version()}'
+
+
+def _vocabulary_last_modified(request, *args, **kwargs):
+    return get_last_modified()
+
+
+def conditional_vocabulary_view(view_func=None, variant=None):
+    """
+    Answer If-None-Match/If-Modified-Since with 304 before `view_func` runs,
+    and ask clients to revalidate instead of heuristically caching.
+
+    Views that return different bytes for the same version (e.g. gzip or
+    identity) pass `variant(request)`, whose result is added to the ETag.
+    """
+    if view_func is None:
+        return partial(conditional_vocabulary_view, variant=variant)
+
+    def etag_func(request, *args, **kwargs):
+        etag = _vocabulary_etag(request)
+        return f'{etag}-{variant(request)}' if variant is not None else etag
+
+    conditional_view = condition(
+        etag_func=etag_func,
+        last_modified_func=_vocabulary_last_modified,
+    )(view_func)
+
+    @wraps(view_func)
+    def wrapped_view(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        patch_cache_control(response, no_cache=True)
+        return response
+    return wrapped_view
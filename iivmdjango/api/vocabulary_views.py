@@ -2,24 +2,108 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from .serializers import VocabularyItemSerializer
-from .models import VocabularyItem, Translation
-from djangobackend.models import UserProfile
+from . import categories, changelog, fuzzy, search, typeahead, vocabulary_cache
+from .export import DEFAULT_CHUNK_SIZE, accepts_gzip, gzip_stream, iter_ndjson
+from .pagination import InvalidPageRequest, get_cursor, get_limit, paginate
+from .models import VocabularyItem, Translation, SavedVocabularyItem
+from .signals import bulk_vocabulary_write, vocabulary_changed
+from djangobackend import profile_cache
 
+PAGINATION_PARAMS = {'cursor', 'limit', 'fields', 'compact'}
+
+@vocabulary_cache.conditional_vocabulary_view
 @api_view(['GET'])
 def getAllVocabularyItems(request):
+    # Older clients send no query parameters and get the full, unpaginated list.
+    if not PAGINATION_PARAMS.intersection(request.GET):
+        payload = vocabulary_cache.get_or_render('all-items', render_all_vocabulary_items)
+        if payload is None:
+            return Response({'detail': 'Vocabulary has not been fetched'}, status=404)
+        return HttpResponse(payload, content_type='application/json')
+
+    try:
+        fields = get_projected_fields(request)
+        limit = get_limit(request)
+        cursor = get_cursor(request)
+        if cursor is not None and not isinstance(cursor[0], str):
+            raise InvalidPageRequest('Invalid cursor')
+    except InvalidPageRequest as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Keyed on the parsed parameters only, so unknown query parameters
+    # cannot mint new cache entries.
+    cache_name = vocabulary_cache.hashed_name('items-page', fields, limit, cursor)
+    payload = vocabulary_cache.get_or_render(
+        cache_name, lambda: render_vocabulary_items_page(fields, limit, cursor)
+    )
+    return HttpResponse(payload, content_type='application/json')
+
+def get_projected_fields(request):
+    fields = list(VocabularyItemSerializer.Meta.fields)
+    if request.GET.get('fields'):
+        requested = [name.strip() for name in request.GET['fields'].split(',') if name.strip()]
+        unknown = set(requested) - set(fields)
+        if unknown:
+            raise InvalidPageRequest(f"Unknown fields: {', '.join(sorted(unknown))}")
+        fields = ['id'] + [name for name in requested if name != 'id']
+    if request.GET.get('compact') in ('1', 'true'):
+        fields = [name for name in fields if name != 'translations']
+    return fields
+
+def render_vocabulary_items_page(fields, limit, cursor):
+    queryset = VocabularyItem.objects.order_by('pk')
+    model_fields = [name for name in ('term', 'definition', 'category') if name in fields]
+    queryset = queryset.only('id', *model_fields)
+    if VocabularyItemSerializer.TRANSLATION_FIELDS.intersection(fields):
+        queryset = queryset.prefetch_related('translations')
+    if cursor is not None:
+        queryset = queryset.filter(pk__gt=cursor[0])
+
+    items, next_cursor = paginate(queryset, limit, lambda item: [item.pk])
+    serializer = VocabularyItemSerializer(items, many=True, fields=fields)
+    return JSONRenderer().render({
+        'results': serializer.data,
+        'next_cursor': next_cursor,
+    })
+
+def render_all_vocabulary_items():
     queryset = VocabularyItem.objects.all().prefetch_related('translations')
     if not queryset.exists():
-        return Response({'detail': 'Vocabulary has not been fetched'}, status=404)
+        return None
     serializer = VocabularyItemSerializer(queryset, many=True)
-    return Response(serializer.data)
+    return JSONRenderer().render(serializer.data)
+
+def export_encoding(request):
+    return 'gzip' if accepts_gzip(request) else 'identity'
+
+@vocabulary_cache.conditional_vocabulary_view(variant=export_encoding)
+@api_view(['GET'])
+def exportVocabulary(request):
+    blobs = iter_ndjson(DEFAULT_CHUNK_SIZE)
+    use_gzip = export_encoding(request) == 'gzip'
+    if use_gzip:
+        blobs = gzip_stream(blobs)
+
+    response = StreamingHttpResponse(blobs, content_type='application/x-ndjson; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="vocabulary.ndjson"'
+    if use_gzip:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
 
+@vocabulary_cache.conditional_vocabulary_view
 @api_view(['GET'])
 def getCategoryLabels(request):
-    categories = list(VocabularyItem.objects.values_list('category', flat=True).distinct())
-    return Response(categories, status=status.HTTP_200_OK)
+    if request.GET.get('counts') in ('1', 'true'):
+        return Response(categories.get_category_counts(), status=status.HTTP_200_OK)
+    return Response(categories.get_categories(), status=status.HTTP_200_OK)
 
+@vocabulary_cache.conditional_vocabulary_view
 @api_view(['GET'])
 def getSpecificVocabularyItem(request, pk):
     try:
@@ -28,116 +112,173 @@ def getSpecificVocabularyItem(request, pk):
         return Response({'detail': 'Vocabulary item does not exist'}, status=404)
     
     serializer = VocabularyItemSerializer(vocabulary_item)
-    categories = list(VocabularyItem.objects.values_list('category', flat=True).distinct())
-    
-    category_items = VocabularyItem.objects.filter(category=vocabulary_item.category).prefetch_related('translations')
-    category_serializer = VocabularyItemSerializer(category_items, many=True)
+    # siblings=lite returns only id+term for the other items in the category.
+    if request.GET.get('siblings') == 'lite':
+        category_items = categories.get_category_members(vocabulary_item.category)
+    else:
+        category_items = get_serialized_category_items(vocabulary_item.category)
     
     return Response({
         'item': serializer.data,
-        'categoryItems': category_serializer.data,
-        'categories': categories
+        'categoryItems': category_items,
+        'categories': categories.get_categories()
     })
 
+@vocabulary_cache.conditional_vocabulary_view
 @api_view(['GET'])
 def getVocabularyByGroup(request, category):
-    queryset = VocabularyItem.objects.filter(category=category).prefetch_related('translations')
-    serializer = VocabularyItemSerializer(queryset, many=True)
-    categories = list(VocabularyItem.objects.values_list('category', flat=True).distinct())
-    
     return Response({
-        'items': serializer.data,
-        'categories': categories
+        'items': get_serialized_category_items(category),
+        'categories': categories.get_categories()
     })
 
-
+def get_serialized_category_items(category):
+    def build():
+        queryset = VocabularyItem.objects.filter(category=category).order_by('term', 'pk').prefetch_related('translations')
+        return list(VocabularyItemSerializer(queryset, many=True).data)
+    return vocabulary_cache.get_or_build(vocabulary_cache.hashed_name('category-items', category), build)
 
 @api_view(['GET'])
 def searchVocabulary(request):
-    query = request.GET.get('q', '')
+    query = request.GET.get('q', '').strip()
     language = request.GET.get('lang', '')
-    
-    items = VocabularyItem.objects.filter(
-        Q(term__icontains=query) |
-        Q(translations__translation__icontains=query)
-    ).distinct()
-    
-    if language:
-        items = items.filter(translations__language=language)
-    
+    if not query:
+        return Response([])
+
+    try:
+        limit = get_limit(request, default=search.DEFAULT_LIMIT)
+    except InvalidPageRequest as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.GET.get('fuzzy') in ('1', 'true'):
+        # Fuzzy matches come from memory, so the language filter runs on all
+        # of them before the limit is applied.
+        item_ids = fuzzy.fuzzy_index.search(query, limit=None if language else limit)
+        if language:
+            item_ids = search.filter_by_language(item_ids, language)[:limit]
+        items = search.load_items(item_ids)
+    else:
+        items = search.search_vocabulary(query, language=language, limit=limit)
     serializer = VocabularyItemSerializer(items, many=True)
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+def typeaheadVocabulary(request):
+    query = request.GET.get('q', '')
+    language = request.GET.get('lang', '')
+    try:
+        limit = get_limit(request, default=typeahead.DEFAULT_LIMIT, maximum=typeahead.MAX_LIMIT)
+    except InvalidPageRequest as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(typeahead.prefix_index.suggest(query, language=language, limit=limit))
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_vocabularyItem(request):
-    with transaction.atomic():
-        vocabulary_data = {
-            'term': request.data.get('term'),
-            'definition': request.data.get('definition'),
-            'category': request.data.get('category', 'uncategorized'),
-        }
-        vocabulary_serializer = VocabularyItemSerializer(data=vocabulary_data)
-        if vocabulary_serializer.is_valid():
+    vocabulary_data = {
+        'term': request.data.get('term'),
+        'definition': request.data.get('definition'),
+        'category': request.data.get('category', 'uncategorized'),
+    }
+    vocabulary_serializer = VocabularyItemSerializer(data=vocabulary_data)
+    if not vocabulary_serializer.is_valid():
+        return Response(vocabulary_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    # Terms differing only by case are rejected by the unique index on
+    # LOWER(term) (see migration 0012) rather than by a racy lookup.
+    try:
+        # One vocabulary_changed for the item and its translations instead
+        # of one per saved row.
+        with transaction.atomic(), bulk_vocabulary_write():
             vocabulary_item = vocabulary_serializer.save()
-            
+
             translations = request.data.get('translations', {})
-            for lang, trans in translations.items():
-                Translation.objects.create(
+            Translation.objects.bulk_create([
+                Translation(
                     vocabulary_item=vocabulary_item,
                     language=lang,
                     translation=trans,
                     is_primary=True
                 )
-            
-            return Response(VocabularyItemSerializer(vocabulary_item).data, status=status.HTTP_201_CREATED)
-        return Response(vocabulary_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                for lang, trans in translations.items()
+            ])
+            vocabulary_changed([vocabulary_item.pk])
+    except IntegrityError:
+        return Response({
+            'error': 'Validation failed',
+            'details': {
+                'term': ['This word already exists in the vocabulary.']
+            }
+        }, status=status.HTTP_409_CONFLICT)
+    return Response(VocabularyItemSerializer(vocabulary_item).data, status=status.HTTP_201_CREATED)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def getSavedVocabularyItemsOfUser(request):
-    try: 
-        user_profile = UserProfile.objects.get(user=request.user)
-        saved_vocabulary_ids = user_profile.savedVocabulary
-        saved_vocabulary_items = VocabularyItem.objects.filter(id__in=saved_vocabulary_ids).prefetch_related('translations')
+    saved = SavedVocabularyItem.objects.filter(user=request.user)
+
+    # Older clients send no query parameters and get the full list.
+    if not {'cursor', 'limit'}.intersection(request.GET):
+        saved_vocabulary_items = VocabularyItem.objects.filter(
+            pk__in=saved.values('vocabulary_item_id')
+        ).prefetch_related('translations')
         serializer = VocabularyItemSerializer(saved_vocabulary_items, many=True)
         return Response(serializer.data)
-    except UserProfile.DoesNotExist:
-        return Response({'detail': 'User profile not found'}, status=404)
+
+    try:
+        limit = get_limit(request)
+        cursor = get_cursor(request)
+        if cursor is not None and not isinstance(cursor[0], int):
+            raise InvalidPageRequest('Invalid cursor')
+    except InvalidPageRequest as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    saved = saved.select_related('vocabulary_item').prefetch_related('vocabulary_item__translations').order_by('-id')
+    if cursor is not None:
+        saved = saved.filter(id__lt=cursor[0])
+    rows, next_cursor = paginate(saved, limit, lambda row: [row.id])
+    items = VocabularyItemSerializer([row.vocabulary_item for row in rows], many=True).data
+    for item, row in zip(items, rows):
+        item['saved_at'] = row.saved_at
+    return Response({'results': items, 'next_cursor': next_cursor})
+
+def get_vocabulary_ids(request):
+    """Return the posted list of vocabulary ids, or None if it is malformed."""
+    vocabulary_ids = request.data.get('vocabulary_ids', [])
+    if not isinstance(vocabulary_ids, list) or not all(isinstance(pk, str) for pk in vocabulary_ids):
+        return None
+    return vocabulary_ids
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@transaction.atomic
 def saveVocabularyForSavedVocabularyOfUser(request):
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        vocabulary_ids = request.data.get('vocabulary_ids', [])
-        
-        current_saved_vocabulary = set(user_profile.savedVocabulary)
-        new_saved_vocabulary = list(current_saved_vocabulary.union(vocabulary_ids))
-        
-        user_profile.savedVocabulary = new_saved_vocabulary
-        user_profile.save()
-        
-        return Response({'message': 'Vocabulary items saved successfully'}, status=200)
-    except UserProfile.DoesNotExist:
-        return Response({'detail': 'User profile not found'}, status=404)
+    vocabulary_ids = get_vocabulary_ids(request)
+    if vocabulary_ids is None:
+        return Response({'detail': 'vocabulary_ids must be a list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Unknown ids are skipped and already-saved ones are left alone by the
+    # unique constraint, so concurrent saves from several devices all stick.
+    existing = list(VocabularyItem.objects.filter(pk__in=vocabulary_ids).values_list('pk', flat=True))
+    with transaction.atomic():
+        SavedVocabularyItem.objects.bulk_create(
+            [SavedVocabularyItem(user=request.user, vocabulary_item_id=pk) for pk in existing],
+            ignore_conflicts=True,
+        )
+        changelog.log_saved_changes(request.user, existing)
+    profile_cache.invalidate(request.user.pk)
+    return Response({'message': 'Vocabulary items saved successfully'}, status=200)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@transaction.atomic
 def removeSavedVocabularyOfUser(request):
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        vocabulary_ids = request.data.get('vocabulary_ids', [])
-        
-        current_saved_vocabulary = set(user_profile.savedVocabulary)
-        new_saved_vocabulary = list(current_saved_vocabulary.difference(vocabulary_ids))
-        
-        user_profile.savedVocabulary = new_saved_vocabulary
-        user_profile.save()
-        
-        return Response({'message': 'Vocabulary items removed successfully'}, status=200)
-    except UserProfile.DoesNotExist:
-        return Response({'detail': 'User profile not found'}, status=404)
\ No newline at end of file
+    vocabulary_ids = get_vocabulary_ids(request)
+    if vocabulary_ids is None:
+        return Response({'detail': 'vocabulary_ids must be a list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        SavedVocabularyItem.objects.filter(user=request.user, vocabulary_item_id__in=vocabulary_ids).delete()
+        changelog.log_saved_changes(request.user, vocabulary_ids)
+    profile_cache.invalidate(request.user.pk)
+    return Response({'message': 'Vocabulary items removed successfully'}, status=200)
\ No newline at end of file
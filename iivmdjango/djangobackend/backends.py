@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from . import password_pool
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend that does its hash work on the password pool while keeping
+    database access on the request thread. Hashes made by a non-preferred
+    hasher or with outdated parameters are upgraded on successful login.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Spend the same hashing time as for a real user so response
+            # times do not reveal which usernames exist.
+            password_pool.make_password(password)
+            return None
+
+        if not password_pool.check_password(password, user.password) or not self.user_can_authenticate(user):
+            return None
+        if password_pool.needs_rehash(user.password):
+            user.password = password_pool.make_password(password)
+            user.save(update_fields=['password'])
+        return user
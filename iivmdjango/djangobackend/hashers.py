@@ -0,0 +1,23 @@
+"""
+Password hashers whose cost parameters come from settings.
+
+PASSWORD_HASHER_PARAMS tunes the work factor without a code change; Django
+rehashes a user's password with the current parameters the next time they
+log in successfully (see PooledModelBackend).
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+
+def get_param(name, default):
+    return getattr(settings, 'PASSWORD_HASHER_PARAMS', {}).get(name, default)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = get_param('PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = get_param('ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+    memory_cost = get_param('ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+    parallelism = get_param('ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
@@ -0,0 +1,73 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import hashers
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from djangobackend import password_pool
+from djangobackend.models import UserProfile
+
+PASSWORD = 'benchmark-Password-1'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure login cost with the configured password hasher: a serial '
+        'end-to-end login through the login view, and hash verification '
+        'throughput through the password pool at several concurrency levels.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help='Logins per measurement (default 20).')
+        parser.add_argument('--concurrency', default='1,4,16', help='Comma-separated client thread counts.')
+
+    def handle(self, *args, **options):
+        logins = options['logins']
+        hasher = hashers.get_hasher('default')
+        summary = hasher.safe_summary(hashers.make_password(PASSWORD))
+        parameters = ', '.join(f'{key}={value}' for key, value in summary.items() if key not in ('algorithm', 'salt', 'hash'))
+        self.stdout.write(f'Hasher: {hasher.algorithm} ({parameters})')
+        self.stdout.write(f"Password pool: {password_pool.get_setting('WORKERS')} worker(s)")
+
+        self.report('serial end-to-end login', logins, self.time_view_logins(logins))
+
+        encoded = hashers.make_password(PASSWORD)
+        for concurrency in [int(value) for value in options['concurrency'].split(',')]:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as clients:
+                results = list(clients.map(lambda _: password_pool.check_password(PASSWORD, encoded), range(logins)))
+            assert all(results)
+            self.report(f'pooled verification x{concurrency}', logins, time.perf_counter() - start)
+
+    def time_view_logins(self, logins):
+        # DEBUG's default ALLOWED_HOSTS accept localhost but not 'testserver'.
+        client = Client(HTTP_HOST='localhost')
+        url = reverse('login')
+        elapsed = None
+        # The benchmark user only exists inside this rolled-back transaction.
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user('benchmark-login-user', password=PASSWORD)
+                UserProfile.objects.create(user=user)
+                start = time.perf_counter()
+                for _ in range(logins):
+                    response = client.post(url, {'username': user.username, 'password': PASSWORD})
+                    assert response.status_code == 200, response.status_code
+                elapsed = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            pass
+        return elapsed
+
+    def report(self, label, count, elapsed):
+        self.stdout.write(
+            f'{label}: {count / elapsed:.1f} logins/s, {elapsed / count * 1000:.1f} ms each'
+        )
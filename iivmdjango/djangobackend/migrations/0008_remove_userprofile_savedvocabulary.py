@@ -0,0 +1,19 @@
+# Generated by Django 3.2.12 on 2026-10-18 08:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangobackend', '0007_userprofile_user_type'),
+        # The saved ids are copied into api.SavedVocabularyItem first.
+        ('api', '0016_saved_vocabulary_item'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='savedVocabulary',
+        ),
+    ]
@@ -10,7 +10,6 @@ class UserProfile(models.Model):
 
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES, default='interpreter')
-    savedVocabulary = models.JSONField(default=list)
 
     def __str__(self):
         return f"{self.user.username} - {self.get_user_type_display()}"
@@ -0,0 +1,63 @@
+"""
+Bounded worker pool for password hashing.
+
+Hashing is deliberately CPU-heavy; during a login storm it would otherwise
+occupy every request thread at once. All hash work goes through `run`, which
+executes it on at most PASSWORD_POOL['WORKERS'] threads (hashlib and argon2
+release the GIL, so these use real cores) and admits at most
+PASSWORD_POOL['MAX_PENDING'] callers. Callers that cannot get in within
+PASSWORD_POOL['WAIT_SECONDS'] get PasswordPoolBusy, which views turn into a
+503 with Retry-After.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+DEFAULTS = {
+    'WORKERS': max(1, (os.cpu_count() or 2) // 2),
+    'MAX_PENDING': 32,
+    'WAIT_SECONDS': 2.0,
+}
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+def get_setting(name):
+    return getattr(settings, 'PASSWORD_POOL', {}).get(name, DEFAULTS[name])
+
+
+_executor = ThreadPoolExecutor(max_workers=get_setting('WORKERS'), thread_name_prefix='password-hash')
+_admission = threading.BoundedSemaphore(get_setting('MAX_PENDING'))
+
+
+def run(func, *args):
+    if not _admission.acquire(timeout=get_setting('WAIT_SECONDS')):
+        raise PasswordPoolBusy('Too many concurrent password operations')
+    try:
+        return _executor.submit(func, *args).result()
+    finally:
+        _admission.release()
+
+
+def check_password(password, encoded):
+    """Verify `password` against `encoded` on the pool; never writes."""
+    return run(hashers.check_password, password, encoded)
+
+
+def make_password(password):
+    return run(hashers.make_password, password)
+
+
+def needs_rehash(encoded):
+    """True if `encoded` was made by another hasher or with other parameters."""
+    preferred = hashers.get_hasher('default')
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
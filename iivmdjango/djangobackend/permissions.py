@@ -0,0 +1,16 @@
+from rest_framework.permissions import BasePermission
+
+from . import profile_cache
+
+
+class IsOverseer(BasePermission):
+    """Overseers and superusers; the profile is read through profile_cache."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        if user.is_superuser:
+            return True
+        profile = profile_cache.get_profile(request, user)
+        return profile is not None and profile['user_type'] in ('overseer', 'superuser')
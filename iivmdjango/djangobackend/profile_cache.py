@@ -0,0 +1,51 @@
+"""
+Short-lived cache of the UserProfile data that views need on most requests.
+
+`get_profile(request)` memoizes on the request and in the default cache for PROFILE_CACHE_TIMEOUT seconds, so an
+authenticated request costs at most one profile query and usually none.
+Writes that change the cached values call `invalidate(user_id)`.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import UserProfile
+
+DEFAULT_TIMEOUT = 60
+
+
+def cache_key(user_id):
+    return f'profile:{user_id}'
+
+
+def load_profile(user_id):
+    return (
+        UserProfile.objects.filter(user_id=user_id)
+        .values('user_type')
+        .annotate(saved_count=Count('user__saved_vocabulary_items'))
+        .first()
+    )
+
+
+def get_profile(request, user=None):
+    """
+    Return {'user_type', 'saved_count'} for `user` (default: the request's
+    user), or None if they have no profile.
+    """
+    user = user or request.user
+    memo = request.__dict__.setdefault('_cached_profiles', {})
+    if user.pk in memo:
+        return memo[user.pk]
+
+    key = cache_key(user.pk)
+    profile = cache.get(key)
+    if profile is None:
+        profile = load_profile(user.pk)
+        if profile is not None:
+            cache.set(key, profile, timeout=getattr(settings, 'PROFILE_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+    memo[user.pk] = profile
+    return profile
+
+
+def invalidate(user_id):
+    cache.delete(cache_key(user_id))
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import UserProfile
+from . import password_pool
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 
@@ -26,10 +27,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = UserProfile
-        fields = ['username', 'email', 'password', 'user_type', 'savedVocabulary']
+        fields = ['username', 'email', 'password', 'user_type']
         extra_kwargs = {
-            'user_type': {'default': 'interpreter'},
-            'savedVocabulary': {'default': list}
+            'user_type': {'default': 'interpreter'}
         }
 
     def validate(self, data):
@@ -50,10 +50,12 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        user_data = {
-            'username': validated_data.pop('username'),
-            'email': validated_data.pop('email'),
-            'password': validated_data.pop('password')
-        }
-        user = User.objects.create_user(**user_data)
+        password = validated_data.pop('password')
+        user = User(
+            username=User.normalize_username(validated_data.pop('username')),
+            email=User.objects.normalize_email(validated_data.pop('email')),
+        )
+        # Hash on the password pool rather than inside create_user().
+        user.password = password_pool.make_password(password)
+        user.save()
         return UserProfile.objects.create(user=user, **validated_data)
\ No newline at end of file
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import profile_cache
+from .models import UserProfile
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def user_profile_changed(sender, instance, **kwargs):
+    profile_cache.invalidate(instance.user_id)
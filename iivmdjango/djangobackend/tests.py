@@ -1,3 +1,71 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.models import VocabularyItem
+from . import password_pool
+from .models import UserProfile
+
+
+class ProfileCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('interpreter', email='i@example.com', password='secret')
+        UserProfile.objects.create(user=self.user, user_type='overseer')
+        VocabularyItem.objects.create(id='item0', term='Term', definition='', category='x')
+        self.client = APIClient()
+
+    def test_login_returns_identity_and_tokens_only(self):
+        data = self.client.post(reverse('login'), {'username': 'interpreter', 'password': 'secret'}).json()
+        self.assertEqual(
+            sorted(data), ['access', 'email', 'refresh', 'user_type', 'username']
+        )
+        self.assertEqual(data['user_type'], 'overseer')
+
+    def test_profile_is_cached_and_invalidated_by_saves(self):
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(reverse('user-profile')).json()['saved_count'], 0)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('user-profile'))
+
+        self.client.post(reverse('save-vocabulary-items-user'), {'vocabulary_ids': ['item0']}, format='json')
+        self.assertEqual(self.client.get(reverse('user-profile')).json()['saved_count'], 1)
+
+        profile = UserProfile.objects.get(user=self.user)
+        profile.user_type = 'interpreter'
+        profile.save()
+        self.assertEqual(self.client.get(reverse('user-profile')).json()['user_type'], 'interpreter')
+
+
+class PasswordPoolTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            username='legacy', password=make_password('secret-Pass-1', hasher='pbkdf2_sha1')
+        )
+        UserProfile.objects.create(user=self.user)
+        self.client = APIClient()
+
+    def login(self):
+        return self.client.post(reverse('login'), {'username': 'legacy', 'password': 'secret-Pass-1'})
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_saturated_pool_answers_503(self):
+        admission = threading.BoundedSemaphore(1)
+        admission.acquire()
+        with mock.patch.object(password_pool, '_admission', admission), \
+                override_settings(PASSWORD_POOL={'WAIT_SECONDS': 0.01}):
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
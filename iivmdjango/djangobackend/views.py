@@ -1,7 +1,7 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from .models import UserProfile
+from . import password_pool, profile_cache
 from .serializers import UserProfileSerializer, UserSerializer
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate
@@ -9,6 +9,14 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.db import transaction
 from django.contrib.auth import update_session_auth_hash
 
+def server_busy_response():
+    response = Response({
+        'error': 'Server busy',
+        'details': {'non_field_errors': ['Too many sign-ins at once, please retry in a moment.']}
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = '1'
+    return response
+
 @api_view(['POST'])
 def change_password(request):
     if not request.user.is_authenticated:
@@ -26,29 +34,33 @@ def change_password(request):
             }
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    user = authenticate(username=request.user.username, password=current_password)
+    try:
+        user = authenticate(username=request.user.username, password=current_password)
+        if user is None:
+            return Response({'error': 'Current password is incorrect.'}, status=status.HTTP_400_BAD_REQUEST)
+        user.password = password_pool.make_password(new_password)
+    except password_pool.PasswordPoolBusy:
+        return server_busy_response()
 
-    if user is not None:
-        user.set_password(new_password)
-        user.save()
-        update_session_auth_hash(request, user)  # Important to keep the user logged in after password change
-        return Response({'message': 'Password changed successfully.'}, status=status.HTTP_200_OK)
-    else:
-        return Response({'error': 'Current password is incorrect.'}, status=status.HTTP_400_BAD_REQUEST)
+    user.save()
+    update_session_auth_hash(request, user)  # Important to keep the user logged in after password change
+    return Response({'message': 'Password changed successfully.'}, status=status.HTTP_200_OK)
     
 @api_view(['GET'])
 def get_user_profile(request):
     if not request.user.is_authenticated:
         return Response({'detail': 'Authentication credentials were not provided.'}, status=401)
 
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-    except UserProfile.DoesNotExist:
+    profile = profile_cache.get_profile(request)
+    if profile is None:
         return Response({'detail': 'User profile not found.'}, status=404)
-    
-    # Correct the serializer to use UserProfileSerializer, not UserSerializer
-    serializer = UserProfileSerializer(user_profile)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+
+    return Response({
+        'username': request.user.username,
+        'email': request.user.email,
+        'user_type': profile['user_type'],
+        'saved_count': profile['saved_count'],
+    }, status=status.HTTP_200_OK)
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
@@ -75,6 +87,8 @@ def create_user_profile(request):
                     'error': 'Validation failed',
                     'details': serializer.errors
                 }, status=status.HTTP_400_BAD_REQUEST)
+    except password_pool.PasswordPoolBusy:
+        return server_busy_response()
     except Exception as e:
         return Response({
             'error': 'An unexpected error occurred',
@@ -89,23 +103,27 @@ def login_user(request):
     if not username or not password:
         return Response({'error': 'Username and password are required', 'details': {'non_field_errors': ['Both username and password are required.']}}, status=status.HTTP_400_BAD_REQUEST)
 
-    user = authenticate(username=username, password=password)
+    try:
+        user = authenticate(username=username, password=password)
+    except password_pool.PasswordPoolBusy:
+        return server_busy_response()
 
     if user is not None:
+        # Only identity and tokens; clients fetch the saved list lazily from
+        # saved-vocabulary-user/.
+        profile = profile_cache.get_profile(request, user)
+        if profile is None:
+            return Response({'error': 'UserProfile not found', 'details': {'non_field_errors': ['User profile not found.']}}, status=status.HTTP_404_NOT_FOUND)
         try:
-            user_profile = UserProfile.objects.get(user=user)
             refresh = RefreshToken.for_user(user)
             response_data = {
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
                 'username': user.username,
                 'email': user.email,
-                'user_type': user_profile.user_type,
-                'savedVocabulary': user_profile.savedVocabulary,
+                'user_type': profile['user_type'],
             }
             return Response(response_data, status=status.HTTP_200_OK)
-        except UserProfile.DoesNotExist:
-            return Response({'error': 'UserProfile not found', 'details': {'non_field_errors': ['User profile not found.']}}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({'error': 'Token generation failed.', 'details': {'non_field_errors': ['An error occurred during login.']}}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     else:
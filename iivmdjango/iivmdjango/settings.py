@@ -9,7 +9,9 @@ https://docs.djangoproject.com/en/3.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
+import os
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.request_metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -87,6 +90,36 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Any shared backend (memcached, redis, file) can be swapped in here; the
+# vocabulary payload cache only relies on get/set/add/incr.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+VOCABULARY_CACHE = {
+    'ALIAS': 'default',
+    'LOCAL_MAXSIZE': 16,
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+# Seconds a user's profile (user_type, saved count) is reused between requests.
+PROFILE_CACHE_TIMEOUT = 60
+
+# Per-request query/serialization/render timings: Server-Timing headers and
+# the overseer-only request-stats/ endpoint. Off unless REQUEST_METRICS=1.
+REQUEST_METRICS = {
+    'ENABLED': os.environ.get('REQUEST_METRICS', '') in ('1', 'true'),
+    'SERVER_TIMING': True,
+    'N_PLUS_ONE_THRESHOLD': int(os.environ.get('REQUEST_METRICS_N_PLUS_ONE', 10)),
+    'SAMPLE_SIZE': 500,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -144,5 +177,36 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
+    'djangobackend.backends.PooledModelBackend',
+]
+
+# Password hashing. PASSWORD_HASHER picks the hasher for new and upgraded
+# hashes ('argon2' and 'bcrypt' need argon2-cffi / bcrypt installed and fall
+# back to PBKDF2 otherwise); the remaining hashers still verify old hashes.
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'djangobackend.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'djangobackend.hashers.TunedArgon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+if PASSWORD_HASHER not in PASSWORD_HASHER_CHOICES:
+    PASSWORD_HASHER = 'pbkdf2'
+elif PASSWORD_HASHER != 'pbkdf2' and find_spec(PASSWORD_HASHER) is None:
+    # The optional library is missing; the module names match the choices.
+    PASSWORD_HASHER = 'pbkdf2'
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
 ]
+PASSWORD_HASHER_PARAMS = {
+    'PBKDF2_ITERATIONS': int(os.environ.get('PBKDF2_ITERATIONS', 260000)),
+    'ARGON2_TIME_COST': int(os.environ.get('ARGON2_TIME_COST', 2)),
+    'ARGON2_MEMORY_COST': int(os.environ.get('ARGON2_MEMORY_COST', 102400)),
+    'ARGON2_PARALLELISM': int(os.environ.get('ARGON2_PARALLELISM', 1)),
+}
+PASSWORD_POOL = {
+    'WORKERS': int(os.environ.get('PASSWORD_POOL_WORKERS', max(1, (os.cpu_count() or 2) // 2))),
+    'MAX_PENDING': 32,
+    'WAIT_SECONDS': 2.0,
+}